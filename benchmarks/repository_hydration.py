@@ -0,0 +1,89 @@
+"""Compare per-row and batch hydration of repository reads.
+
+Run with ``python -m benchmarks.repository_hydration [rows]``. Like
+:mod:`timeit`, the collector is paused while timing so that GC passes
+triggered by the allocated models do not drown the difference.
+"""
+
+from __future__ import annotations
+
+import gc
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from infra.repositories import (
+    CharacterRepository,
+    TimelineEventRepository,
+    character,
+    timeline_event,
+)
+
+MIGRATIONS = sorted(
+    (Path(__file__).resolve().parents[1] / "infra" / "migrations").glob("*.sql")
+)
+REPEAT = 5
+
+
+def _timed(label: str, func) -> float:
+    times = []
+    for _ in range(REPEAT):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    elapsed = statistics.median(times)
+    print(f"{label:<36} {elapsed * 1000:10.1f} ms  (median of {REPEAT})")
+    return elapsed
+
+
+def main(rows: int = 100_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(Path(tmp) / "bench.db")
+        conn.row_factory = sqlite3.Row
+        for path in MIGRATIONS:
+            conn.executescript(path.read_text(encoding="utf-8"))
+
+        chars = CharacterRepository(conn)
+        events = TimelineEventRepository(conn)
+        chars.create_many(
+            {"name": f"C{i}", "birth_year": -i % 500, "faction": "Guild"}
+            for i in range(rows)
+        )
+        events.create_many(
+            {
+                "id": f"e{i}",
+                "title": f"Event {i}",
+                "year": i % 1000,
+                "character_ids": [f"C{i}", f"C{i + 1}"],
+                "tags": ["war"],
+            }
+            for i in range(rows)
+        )
+        conn.commit()
+
+        for table, repo, module in (
+            ("characters", chars, character),
+            ("timeline_events", events, timeline_event),
+        ):
+
+            def per_row() -> list:
+                cur = conn.execute(f"SELECT {module._COLUMNS} FROM {table}")
+                return [module._to_model(row) for row in cur.fetchall()]
+
+            row_by_row = _timed(f"{table} per-row models", per_row)
+            batch = _timed(f"{table} list()", repo.list)
+            _timed(f"{table} iter()", lambda: list(repo.iter()))
+            print(f"{'list() speedup':<36} {row_by_row / batch:10.2f}x\n")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
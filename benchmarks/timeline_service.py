@@ -0,0 +1,55 @@
+"""Compare ways of filling TimelineService with many events.
+
+Run with ``python -m benchmarks.timeline_service [events]``.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+from core.timeline.service import Evento, TimelineService
+
+
+def _timed(label: str, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:10.1f} ms")
+    return elapsed
+
+
+def _append_and_sort(eventos: list[Evento]) -> None:
+    # What add_event used to do: append, then sort the whole list.
+    service = TimelineService()
+    for evento in eventos:
+        service.eventos.append(evento)
+        service.sort_events()
+
+
+def _insert_each(eventos: list[Evento]) -> None:
+    service = TimelineService()
+    for evento in eventos:
+        service.add_event(evento)
+
+
+def main(count: int = 100_000) -> None:
+    rng = random.Random(0)
+    eventos = [
+        Evento(titulo=f"Evento {i}", instante=rng.randrange(-5000, 5000), id=str(i))
+        for i in range(count)
+    ]
+    legacy = min(count, 10_000)
+    # The old per-insert sort is quadratic, so it only runs on a prefix.
+    head = eventos[:legacy]
+    _timed(f"append + sort_events ({legacy} events)", lambda: _append_and_sort(head))
+    _timed(f"add_event ({legacy} events)", lambda: _insert_each(head))
+    _timed(f"add_event ({count} events)", lambda: _insert_each(eventos))
+    _timed(
+        f"add_events ({count} events)", lambda: TimelineService().add_events(eventos)
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -22,6 +22,12 @@ class Config:
     language: str = os.getenv("APP_LANGUAGE", "pt-br")
     theme: str = os.getenv("APP_THEME", "light")
     debug: bool = os.getenv("APP_DEBUG", "0") == "1"
+    backup_interval: int = int(os.getenv("APP_BACKUP_INTERVAL", "3600"))
+    backup_dedupe: bool = os.getenv("APP_BACKUP_DEDUPE", "0") == "1"
+    db_profile: str = os.getenv("APP_DB_PROFILE", "safe")
+    db_pragmas: str = os.getenv("APP_DB_PRAGMAS", "")
+    db_trace: bool = os.getenv("APP_DB_TRACE", "0") == "1"
+    db_slow_ms: float = float(os.getenv("APP_DB_SLOW_MS", "100"))
 
     def load_user_settings(self) -> None:
         """Load user settings from ``settings.json`` if available."""
@@ -2,9 +2,9 @@
 
 from __future__ import annotations
 
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import Iterable, List
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Set, Tuple
 
 from .models import Faction, TimelineEvent
 
@@ -18,13 +18,28 @@ class CharacterOverlap:
     locations: List[str]
 
 
+@dataclass
+class Issue:
+    """A single problem reported by a coherence rule."""
+
+    rule: str
+    entity: str
+    message: str
+
+
 @dataclass
 class CoherenceReport:
-    """Aggregated inconsistencies found in the world data."""
+    """Aggregated inconsistencies found in the world data.
+
+    ``issues`` and ``timings`` (seconds spent per rule) are filled by the
+    rule suite in :mod:`core.coherence_rules`.
+    """
 
     conflicting_dates: List[str]
     character_overlaps: List[CharacterOverlap]
     duplicate_factions: List[str]
+    issues: List[Issue] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
 
 
 def generate_report(
@@ -71,3 +86,192 @@ def generate_report(
         character_overlaps=overlaps,
         duplicate_factions=duplicates,
     )
+
+
+@dataclass
+class CoherenceDelta:
+    """Issues introduced and resolved by one change to a :class:`CoherenceIndex`.
+
+    An overlap whose set of locations changes is reported as resolved with
+    its old locations and introduced with the new ones.
+    """
+
+    introduced: CoherenceReport
+    resolved: CoherenceReport
+
+    def __bool__(self) -> bool:
+        return any(
+            (
+                self.introduced.conflicting_dates,
+                self.introduced.character_overlaps,
+                self.introduced.duplicate_factions,
+                self.resolved.conflicting_dates,
+                self.resolved.character_overlaps,
+                self.resolved.duplicate_factions,
+            )
+        )
+
+
+# (conflicting ids, overlapping locations by (character, year), duplicate names)
+_Snapshot = Tuple[Set[str], Dict[Tuple[str, int], Tuple[str, ...]], Set[str]]
+
+
+class CoherenceIndex:
+    """Incrementally maintained version of :func:`generate_report`.
+
+    Events and factions are added, updated and removed as deltas; each call
+    touches only the identifiers, character/year slots and faction names of
+    the changed entities and returns the issues it introduced or resolved.
+    Updates and removals must be given the entity as it was last added.
+    """
+
+    def __init__(
+        self, events: Iterable[TimelineEvent] = (), factions: Iterable[Faction] = ()
+    ) -> None:
+        self._years: Dict[str, Counter[int]] = {}
+        self._locations: Dict[str, Dict[int, Counter[str]]] = {}
+        self._factions: Counter[str] = Counter()
+        self._conflicting: Set[str] = set()
+        self._duplicates: Dict[str, None] = {}
+        for ev in events:
+            self._add_event(ev)
+        for faction in factions:
+            self._add_faction(faction.name)
+
+    # -- deltas ----------------------------------------------------------
+    def add_event(self, event: TimelineEvent) -> CoherenceDelta:
+        """Index *event* and return the issues this changed."""
+        return self._apply([event], [], lambda: self._add_event(event))
+
+    def remove_event(self, event: TimelineEvent) -> CoherenceDelta:
+        """Forget *event* and return the issues this changed."""
+        return self._apply([event], [], lambda: self._remove_event(event))
+
+    def update_event(self, old: TimelineEvent, new: TimelineEvent) -> CoherenceDelta:
+        """Replace *old* with *new* and return the issues this changed."""
+
+        def change() -> None:
+            self._remove_event(old)
+            self._add_event(new)
+
+        return self._apply([old, new], [], change)
+
+    def add_faction(self, faction: Faction) -> CoherenceDelta:
+        """Index *faction* and return the issues this changed."""
+        return self._apply([], [faction.name], lambda: self._add_faction(faction.name))
+
+    def remove_faction(self, faction: Faction) -> CoherenceDelta:
+        """Forget *faction* and return the issues this changed."""
+        return self._apply(
+            [], [faction.name], lambda: self._remove_faction(faction.name)
+        )
+
+    def update_faction(self, old: Faction, new: Faction) -> CoherenceDelta:
+        """Replace *old* with *new* and return the issues this changed."""
+
+        def change() -> None:
+            self._remove_faction(old.name)
+            self._add_faction(new.name)
+
+        return self._apply([], [old.name, new.name], change)
+
+    def report(self) -> CoherenceReport:
+        """Return every issue currently present."""
+        overlaps = [
+            CharacterOverlap(char, year, sorted(locs))
+            for char, years in self._locations.items()
+            for year, locs in years.items()
+            if len(locs) > 1
+        ]
+        return CoherenceReport(
+            conflicting_dates=sorted(self._conflicting),
+            character_overlaps=overlaps,
+            duplicate_factions=list(self._duplicates),
+        )
+
+    # -- bookkeeping -------------------------------------------------------
+    def _add_event(self, ev: TimelineEvent) -> None:
+        years = self._years.setdefault(ev.id, Counter())
+        years[ev.year] += 1
+        if len(years) > 1:
+            self._conflicting.add(ev.id)
+        if not ev.location_ids:
+            return
+        for char in set(ev.character_ids):
+            locs = self._locations.setdefault(char, {}).setdefault(ev.year, Counter())
+            locs.update(set(ev.location_ids))
+
+    def _remove_event(self, ev: TimelineEvent) -> None:
+        years = self._years.get(ev.id)
+        if not years or not years[ev.year]:
+            raise KeyError(f"Event {ev.id!r} ({ev.year}) is not indexed")
+        years[ev.year] -= 1
+        if not years[ev.year]:
+            del years[ev.year]
+        if len(years) <= 1:
+            self._conflicting.discard(ev.id)
+        if not years:
+            del self._years[ev.id]
+        if not ev.location_ids:
+            return
+        for char in set(ev.character_ids):
+            by_year = self._locations[char]
+            locs = by_year[ev.year]
+            locs.subtract(set(ev.location_ids))
+            for loc in [loc for loc, n in locs.items() if n <= 0]:
+                del locs[loc]
+            if not locs:
+                del by_year[ev.year]
+                if not by_year:
+                    del self._locations[char]
+
+    def _add_faction(self, name: str) -> None:
+        self._factions[name] += 1
+        if self._factions[name] == 2:
+            self._duplicates[name] = None
+
+    def _remove_faction(self, name: str) -> None:
+        if not self._factions[name]:
+            raise KeyError(f"Faction {name!r} is not indexed")
+        self._factions[name] -= 1
+        if self._factions[name] < 2:
+            self._duplicates.pop(name, None)
+        if not self._factions[name]:
+            del self._factions[name]
+
+    def _snapshot(self, events: List[TimelineEvent], names: List[str]) -> _Snapshot:
+        slots = {(c, ev.year) for ev in events for c in ev.character_ids}
+        overlaps: Dict[Tuple[str, int], Tuple[str, ...]] = {}
+        for char, year in slots:
+            locs = self._locations.get(char, {}).get(year)
+            if locs is not None and len(locs) > 1:
+                overlaps[(char, year)] = tuple(sorted(locs))
+        return (
+            {ev.id for ev in events if ev.id in self._conflicting},
+            overlaps,
+            {name for name in names if name in self._duplicates},
+        )
+
+    def _apply(
+        self,
+        events: List[TimelineEvent],
+        names: List[str],
+        change: Callable[[], None],
+    ) -> CoherenceDelta:
+        before = self._snapshot(events, names)
+        change()
+        after = self._snapshot(events, names)
+        return CoherenceDelta(_difference(after, before), _difference(before, after))
+
+
+def _difference(a: _Snapshot, b: _Snapshot) -> CoherenceReport:
+    """Return the issues of snapshot *a* that are not in snapshot *b*."""
+    return CoherenceReport(
+        conflicting_dates=sorted(a[0] - b[0]),
+        character_overlaps=[
+            CharacterOverlap(char, year, list(locs))
+            for (char, year), locs in sorted(a[1].items())
+            if b[1].get((char, year)) != locs
+        ],
+        duplicate_factions=sorted(a[2] - b[2]),
+    )
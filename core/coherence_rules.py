@@ -0,0 +1,397 @@
+"""Pluggable coherence rules run in parallel over sharded world data.
+
+Rules are registered with :func:`rule`. The world is split once into
+:class:`Shard` slices of plain tuples holding the entities whose id falls
+into each shard (see :func:`in_shard`); a sharded rule inspects one slice at
+a time and looks everything else up in a :class:`RuleContext`. Unsharded
+rules, such as cycle detection, receive a single shard of the whole world.
+:func:`run_rules` runs the rules in process, or spreads them over a process
+pool, and merges them with :func:`core.coherence.generate_report` into a
+single :class:`~core.coherence.CoherenceReport`.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .coherence import CoherenceReport, Issue, generate_report
+from .models import Character, Faction, TimelineEvent
+from .services.validations import birth_violation_pairs
+from .timeline.service import Evento
+
+
+@dataclass
+class WorldSnapshot:
+    """World data checked by coherence rules.
+
+    ``characters`` are keyed by the ids used in ``TimelineEvent.character_ids``,
+    ``eras`` map an era name to its ``(inicio, fim)`` range (``fim``
+    exclusive) and ``depende_de`` maps an event id to the ids it depends on.
+    """
+
+    events: List[TimelineEvent] = field(default_factory=list)
+    characters: Dict[str, Character] = field(default_factory=dict)
+    factions: List[Faction] = field(default_factory=list)
+    eras: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    depende_de: Dict[str, List[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_eventos(
+        cls,
+        eventos: Iterable[Evento],
+        eras: Iterable = (),
+        characters: Optional[Dict[str, Character]] = None,
+        factions: Iterable[Faction] = (),
+    ) -> WorldSnapshot:
+        """Build a snapshot from timeline editor data.
+
+        *eras* are objects with ``nome``, ``inicio`` and ``fim`` attributes.
+        ``depende_de`` entries naming an event title are resolved to its id;
+        anything else is kept as is so it shows up as dangling.
+        """
+        eventos = list(eventos)
+        by_title = {ev.titulo: ev.id for ev in eventos}
+        return cls(
+            events=[
+                TimelineEvent(
+                    id=ev.id,
+                    title=ev.titulo,
+                    year=ev.instante,
+                    era=ev.era or None,
+                    scope=ev.escopo,
+                    description=ev.descricao,
+                    character_ids=list(ev.personagens),
+                    location_ids=list(ev.lugares),
+                    tags=list(ev.tags),
+                )
+                for ev in eventos
+            ],
+            characters=dict(characters or {}),
+            factions=list(factions),
+            eras={era.nome: (era.inicio, era.fim) for era in eras},
+            depende_de={
+                ev.id: [by_title.get(dep, dep) for dep in ev.depende_de]
+                for ev in eventos
+                if ev.depende_de
+            },
+        )
+
+
+EventRow = Tuple[str, str, int, Optional[str], Tuple[str, ...]]
+"""``(id, title, year, era, character_ids)`` of one event."""
+
+CharacterRow = Tuple[str, str, Optional[str]]
+"""``(id, name, faction)`` of one character."""
+
+
+@dataclass
+class Shard:
+    """The events, characters and dependencies of one shard as plain data."""
+
+    events: List[EventRow] = field(default_factory=list)
+    characters: List[CharacterRow] = field(default_factory=list)
+    depende_de: Dict[str, List[str]] = field(default_factory=dict)
+
+
+@dataclass
+class RuleContext:
+    """Whole-world lookups shared by every shard of a run.
+
+    Only plain values are kept, so sending the context to a worker process
+    costs far less than pickling the snapshot's models.
+    """
+
+    birth_years: Dict[str, int]
+    character_names: Dict[str, str]
+    event_ids: set[str]
+    faction_names: set[str]
+    eras: Dict[str, Tuple[int, int]]
+
+    @classmethod
+    def from_world(cls, world: WorldSnapshot) -> RuleContext:
+        return cls(
+            birth_years={cid: c.birth_year for cid, c in world.characters.items()},
+            character_names={cid: c.name for cid, c in world.characters.items()},
+            event_ids={ev.id for ev in world.events},
+            faction_names={f.name for f in world.factions},
+            eras=dict(world.eras),
+        )
+
+
+RuleCheck = Callable[[Shard, RuleContext], Iterable[Issue]]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A registered coherence check.
+
+    ``check(part, context)`` yields the issues found in *part*, the
+    :class:`Shard` holding one shard's events, characters and dependencies;
+    unsharded rules are always called with a shard of the whole world.
+    """
+
+    name: str
+    check: RuleCheck
+    sharded: bool = True
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def rule(name: str, *, sharded: bool = True) -> Callable[[RuleCheck], RuleCheck]:
+    """Register the decorated function as coherence rule *name*.
+
+    Rules run in worker processes, so they must be importable module-level
+    functions.
+    """
+
+    def decorator(check: RuleCheck) -> RuleCheck:
+        RULES[name] = Rule(name, check, sharded)
+        return check
+
+    return decorator
+
+
+def shard_of(entity_id: str, shards: int) -> int:
+    """Return the shard out of *shards* that *entity_id* belongs to."""
+    return zlib.crc32(entity_id.encode("utf-8")) % shards
+
+
+def in_shard(entity_id: str, shard: int, shards: int) -> bool:
+    """Return whether *entity_id* belongs to *shard* out of *shards*."""
+    return shards == 1 or shard_of(entity_id, shards) == shard
+
+
+def partition(world: WorldSnapshot, shards: int) -> List[Shard]:
+    """Split the events, characters and dependencies of *world* into shards.
+
+    Factions and eras are lookups rather than checked entities, so rules
+    read them from the :class:`RuleContext` instead.
+    """
+    parts = [Shard() for _ in range(shards)]
+    for ev in world.events:
+        parts[shard_of(ev.id, shards)].events.append(
+            (ev.id, ev.title, ev.year, ev.era, tuple(ev.character_ids))
+        )
+    for char_id, char in world.characters.items():
+        parts[shard_of(char_id, shards)].characters.append(
+            (char_id, char.name, char.faction)
+        )
+    for event_id, deps in world.depende_de.items():
+        parts[shard_of(event_id, shards)].depende_de[event_id] = deps
+    return parts
+
+
+# -- built-in rules ----------------------------------------------------------
+@rule("birth_before_appearance")
+def _birth_before_appearance(part: Shard, context: RuleContext) -> Iterable[Issue]:
+    appearances = ((year, char_ids) for _, _, year, _, char_ids in part.events)
+    for pos, char_id in birth_violation_pairs(appearances, context.birth_years):
+        event_id, title = part.events[pos][:2]
+        yield Issue(
+            "birth_before_appearance",
+            event_id,
+            f"Character '{context.character_names[char_id]}' appears in {title} "
+            "before their birth",
+        )
+
+
+@rule("era_bounds")
+def _era_bounds(part: Shard, context: RuleContext) -> Iterable[Issue]:
+    for event_id, title, year, era, _ in part.events:
+        bounds = context.eras.get(era or "")
+        if bounds is None:
+            continue
+        inicio, fim = bounds
+        if not inicio <= year < fim:
+            yield Issue(
+                "era_bounds",
+                event_id,
+                f"{title} ({year}) lies outside era '{era}' [{inicio}, {fim})",
+            )
+
+
+@rule("dangling_dependency")
+def _dangling_dependency(part: Shard, context: RuleContext) -> Iterable[Issue]:
+    for event_id, deps in part.depende_de.items():
+        for dep in deps:
+            if dep not in context.event_ids:
+                yield Issue(
+                    "dangling_dependency",
+                    event_id,
+                    f"Depends on unknown event '{dep}'",
+                )
+
+
+@rule("dependency_cycle", sharded=False)
+def _dependency_cycle(part: Shard, context: RuleContext) -> Iterable[Issue]:
+    for cycle in _cycles(part.depende_de):
+        yield Issue(
+            "dependency_cycle",
+            cycle[0],
+            "Dependency cycle: " + " -> ".join([*cycle, cycle[0]]),
+        )
+
+
+@rule("missing_faction")
+def _missing_faction(part: Shard, context: RuleContext) -> Iterable[Issue]:
+    for char_id, name, faction in part.characters:
+        if faction and faction not in context.faction_names:
+            yield Issue(
+                "missing_faction",
+                char_id,
+                f"Character '{name}' belongs to unknown faction '{faction}'",
+            )
+
+
+def _cycles(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """Return the strongly connected components of *graph* that form cycles.
+
+    Iterative Tarjan, so long dependency chains cannot hit the recursion limit.
+    """
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: set[str] = set()
+    cycles: List[List[str]] = []
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph.get(root, ())))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph.get(child, ()))))
+                elif child in on_stack:
+                    low[node] = min(low[node], index[child])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] != index[node]:
+                continue
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member == node:
+                    break
+            if len(component) > 1 or node in graph.get(node, ()):
+                cycles.append(component[::-1])
+    return cycles
+
+
+# -- execution -----------------------------------------------------------------
+_worker_context: Optional[RuleContext] = None
+_worker_rules: Dict[str, Rule] = {}
+
+TaskResult = Tuple[str, List[Issue], float]
+
+
+def _init_worker(context: Optional[RuleContext], rules: Sequence[Rule]) -> None:
+    global _worker_context, _worker_rules
+    _worker_context = context
+    _worker_rules = {r.name: r for r in rules}
+
+
+def _run_task(names: Sequence[str], part: Shard) -> List[TaskResult]:
+    """Run the rules *names* over *part*."""
+    results = []
+    for name in names:
+        start = time.perf_counter()
+        issues = list(_worker_rules[name].check(part, _worker_context))
+        results.append((name, issues, time.perf_counter() - start))
+    return results
+
+
+def run_rules(
+    world: WorldSnapshot,
+    rules: Optional[Iterable[str]] = None,
+    *,
+    workers: Optional[int] = 0,
+    shards: Optional[int] = None,
+) -> CoherenceReport:
+    """Run the registered *rules* (default: all) over *world*.
+
+    The world is partitioned once into *shards* slices; each slice is one
+    task running every sharded rule, and each unsharded rule is a task of
+    its own over the whole world. By default everything runs in the calling
+    process on a single shard. With *workers* > 0 (``None``: CPU count) the
+    tasks run in a process pool, four shards per worker unless *shards* is
+    given; workers receive the plain :class:`RuleContext` and shards, never
+    the snapshot itself. The report holds the checks of
+    :func:`~core.coherence.generate_report`, every rule issue and the
+    seconds each rule took summed over its shards.
+    """
+    selected = [RULES[name] for name in (RULES if rules is None else rules)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    shards = shards or (workers * 4 if workers else 1)
+    sharded = [r.name for r in selected if r.sharded]
+    unsharded = [r.name for r in selected if not r.sharded]
+    parts = partition(world, shards) if sharded else []
+    tasks: List[Tuple[Sequence[str], Shard]] = []
+    if unsharded:
+        whole = parts[0] if len(parts) == 1 else partition(world, 1)[0]
+        tasks.extend(([name], whole) for name in unsharded)
+    tasks.extend((sharded, part) for part in parts)
+    context = RuleContext.from_world(world)
+
+    def core_report() -> CoherenceReport:
+        start = time.perf_counter()
+        report = generate_report(world.events, world.factions)
+        report.timings["generate_report"] = time.perf_counter() - start
+        return report
+
+    if workers == 0:
+        _init_worker(context, selected)
+        try:
+            results = [_run_task(*task) for task in tasks]
+        finally:
+            _init_worker(None, ())
+        report = core_report()
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(context, selected)
+        ) as pool:
+            futures = [pool.submit(_run_task, *task) for task in tasks]
+            # The built-in checks run here while the workers handle the rules.
+            report = core_report()
+            results = [future.result() for future in futures]
+
+    for r in selected:
+        report.timings[r.name] = 0.0
+    for task_results in results:
+        for name, issues, elapsed in task_results:
+            report.issues.extend(issues)
+            report.timings[name] += elapsed
+    return report
+
+
+__all__ = [
+    "RULES",
+    "Rule",
+    "RuleContext",
+    "Shard",
+    "WorldSnapshot",
+    "in_shard",
+    "partition",
+    "rule",
+    "run_rules",
+    "shard_of",
+]
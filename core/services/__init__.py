@@ -1,6 +1,15 @@
 """Service layer for domain-related operations."""
 
-from .validations import validate_event_characters
-
-__all__ = ["validate_event_characters"]
+from .validations import (
+    BirthViolation,
+    find_birth_violations,
+    find_unborn_characters,
+    validate_event_characters,
+)
 
+__all__ = [
+    "BirthViolation",
+    "find_birth_violations",
+    "find_unborn_characters",
+    "validate_event_characters",
+]
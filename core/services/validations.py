@@ -2,11 +2,27 @@
 
 from __future__ import annotations
 
-from typing import Dict
+import operator
+from array import array
+from dataclasses import dataclass
+from itertools import compress
+from typing import Dict, Iterable, List, Sequence, Tuple
 
 from core.models import Character, TimelineEvent
 
 
+def find_unborn_characters(
+    event: TimelineEvent, characters: Dict[str, Character]
+) -> List[Character]:
+    """Return the characters of *event* whose birth year is after the event."""
+    unborn = []
+    for char_id in event.character_ids:
+        char = characters.get(char_id)
+        if char and event.year < char.birth_year:
+            unborn.append(char)
+    return unborn
+
+
 def validate_event_characters(
     event: TimelineEvent, characters: Dict[str, Character]
 ) -> None:
@@ -15,13 +31,88 @@ def validate_event_characters(
     Raises a ``ValueError`` if the event year precedes a character's birth year.
     """
 
-    for char_id in event.character_ids:
-        char = characters.get(char_id)
-        if char and event.year < char.birth_year:
-            raise ValueError(
-                f"Character '{char.name}' appears in {event.title} before their birth"
-            )
+    unborn = find_unborn_characters(event, characters)
+    if unborn:
+        raise ValueError(
+            f"Character '{unborn[0].name}' appears in {event.title} before their birth"
+        )
+
+
+@dataclass
+class BirthViolation:
+    """A character appearing in an event dated before their birth."""
+
+    event: TimelineEvent
+    character_id: str
+    character: Character
 
 
-__all__ = ["validate_event_characters"]
+def _earlier_positions(years: array, births: array) -> Sequence[int]:
+    """Return the indexes where ``years[i] < births[i]``.
+
+    Uses NumPy when it is installed; otherwise the ``array`` buffers are
+    compared element-wise with C-level iterators.
+    """
+    try:
+        import numpy as np  # type: ignore
+    except ModuleNotFoundError:
+        return list(compress(range(len(years)), map(operator.lt, years, births)))
+    if not years:
+        return []
+    year_arr = np.frombuffer(years, dtype=np.int64)
+    birth_arr = np.frombuffer(births, dtype=np.int64)
+    return np.flatnonzero(year_arr < birth_arr).tolist()
+
+
+def birth_violation_pairs(
+    appearances: Iterable[Tuple[int, Sequence[str]]], birth_years: Dict[str, int]
+) -> List[Tuple[int, str]]:
+    """Return ``(position, character id)`` for each appearance before a birth.
+
+    *appearances* are ``(year, character_ids)`` pairs and positions index
+    into them. The years of all (appearance, character) pairs are laid out
+    in two parallel arrays and compared in a single vectorized pass; ids
+    missing from *birth_years* are ignored.
+    """
+    owners = array("q")
+    years = array("q")
+    births = array("q")
+    char_ids: List[str] = []
+    for pos, (year, ids) in enumerate(appearances):
+        for char_id in ids:
+            birth = birth_years.get(char_id)
+            if birth is not None:
+                owners.append(pos)
+                years.append(year)
+                births.append(birth)
+                char_ids.append(char_id)
+    return [(owners[i], char_ids[i]) for i in _earlier_positions(years, births)]
+
+
+def find_birth_violations(
+    events: Iterable[TimelineEvent], characters: Dict[str, Character]
+) -> List[BirthViolation]:
+    """Return every event/character pair where the event precedes the birth.
+
+    All events are checked in one :func:`birth_violation_pairs` call, so a
+    whole world is validated at once. Unknown character ids are ignored, as
+    in :func:`validate_event_characters`.
+    """
+    events = list(events)
+    pairs = birth_violation_pairs(
+        ((event.year, event.character_ids) for event in events),
+        {char_id: char.birth_year for char_id, char in characters.items()},
+    )
+    return [
+        BirthViolation(events[pos], char_id, characters[char_id])
+        for pos, char_id in pairs
+    ]
+
 
+__all__ = [
+    "BirthViolation",
+    "birth_violation_pairs",
+    "find_birth_violations",
+    "find_unborn_characters",
+    "validate_event_characters",
+]
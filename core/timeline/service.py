@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from bisect import insort
 from dataclasses import dataclass, field
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Tuple
 import uuid
 
 
@@ -23,21 +24,49 @@ class Evento:
     lugares: List[str] = field(default_factory=list)
 
 
+def _ordem(evento: Evento) -> Tuple[int, str]:
+    return (evento.instante, evento.titulo)
+
+
 class TimelineService:
-    """Serviço para manipulação de eventos de linha do tempo."""
+    """Serviço para manipulação de eventos de linha do tempo.
+
+    Os eventos são mantidos ordenados por instante e título: inserções usam
+    busca binária em vez de reordenar a lista a cada evento.
+    """
 
     def __init__(self, eventos: Iterable[Evento] | None = None) -> None:
-        self.eventos: List[Evento] = list(eventos or [])
+        self._eventos: List[Evento] = []
+        self.eventos = list(eventos or [])
+
+    @property
+    def eventos(self) -> List[Evento]:
+        return self._eventos
+
+    @eventos.setter
+    def eventos(self, eventos: List[Evento]) -> None:
+        # A lista é adotada (não copiada) para continuar compartilhada com a
+        # Timeline da UI, e ordenada no lugar.
+        self._eventos = eventos
+        self.sort_events()
 
     def add_event(self, evento: Evento) -> None:
-        """Adiciona um evento e mantém a ordenação."""
-        self.eventos.append(evento)
+        """Adiciona um evento na posição que mantém a ordenação."""
+        insort(self._eventos, evento, key=_ordem)
+
+    def add_events(self, eventos: Iterable[Evento]) -> None:
+        """Adiciona vários eventos ordenando a lista uma única vez."""
+        self._eventos.extend(eventos)
         self.sort_events()
 
     def sort_events(self) -> List[Evento]:
-        """Ordena eventos por instante e título."""
-        self.eventos.sort(key=lambda e: (e.instante, e.titulo))
-        return self.eventos
+        """Ordena eventos por instante e título.
+
+        Só é necessário após alterar ``instante`` ou ``titulo`` de eventos já
+        adicionados.
+        """
+        self._eventos.sort(key=_ordem)
+        return self._eventos
 
     def resolve_conflicts(self) -> List[str]:
         """Retorna lista de IDs com datas conflitantes."""
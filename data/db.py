@@ -1,16 +1,119 @@
+import atexit
 import json
 import sqlite3
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Callable, Iterable, Iterator, Mapping
+
+from data.diplomacy import DiplomacyIndex
+from infra.sqlite_pool import ConnectionPool
+from infra.sqlite_profile import apply_profile
 
 DB_FILE = Path.cwd() / "world.db"
 JSON_EXPORT = Path.cwd() / "world_export.json"
 
+TABLES = [
+    "entity_registry",
+    "governos",
+    "regioes",
+    "assentamentos",
+    "relacoes_governamentais",
+    "ligas",
+    "liga_membros",
+    "planetas",
+    "planeta_cidades",
+    "personagens",
+    "economia",
+    "grupos",
+    "timeline",
+]
+
+# JSON mirror settings, see :func:`configure_export`.
+EXPORT_MODE = "immediate"  # immediate | debounced | off
+EXPORT_LAYOUT = "combined"  # combined | per_table
+EXPORT_DELAY = 2.0
+
+# Keep ``IN (...)`` lists below SQLite's historical 999 parameter limit.
+MAX_PARAMS = 900
+
+_pool = ConnectionPool()
+_schema_ready: set[Path] = set()
+_schema_lock = threading.Lock()
+
+REGISTRY_CACHE_SIZE = 100_000
+
+_diplomacy: tuple[Path, DiplomacyIndex] | None = None
+_diplomacy_lock = threading.Lock()
+
+_dirty_tables: set[str] = set()
+_export_lock = threading.RLock()
+_export_deadline: float | None = None
+_export_wakeup = threading.Event()
+_exporter: threading.Thread | None = None
+_pending = threading.local()
+
+
+def _open(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    apply_profile(conn)
+    return conn
+
 
 def get_connection() -> sqlite3.Connection:
-    """Return a connection to the SQLite database."""
-    return sqlite3.connect(DB_FILE)
+    """Return the long-lived connection of the current thread.
+
+    Connections are cached per thread and per database file so repeated calls
+    reuse the same handle. New connections get the configured SQLite profile.
+    """
+    return _pool.get(DB_FILE, _open)
+
+
+def close_connections() -> None:
+    """Close every connection opened by the current thread."""
+    _pool.close_all()
+
+
+def _committed() -> None:
+    tables = _pending_tables()
+    if tables:
+        dirty = list(tables)
+        tables.clear()
+        _schedule_export(dirty)
+
+
+def _rolled_back() -> None:
+    # State from the aborted transaction must not stay cached or exported.
+    _pending_tables().clear()
+    registry_cache.clear()
+    reset_diplomacy_index()
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """Yield the thread connection wrapped in a transaction.
+
+    Commits on successful exit and rolls back however else the block is left.
+    Nested usages join the outermost transaction, which alone commits or
+    rolls back.
+    """
+    with _pool.transaction(
+        get_connection(), on_commit=_committed, on_rollback=_rolled_back
+    ) as conn:
+        yield conn
+
+
+def _ensure_schema() -> None:
+    """Run :func:`init_db` once per database file and process."""
+    if DB_FILE in _schema_ready:
+        return
+    with _schema_lock:
+        if DB_FILE not in _schema_ready:
+            init_db()
+            _schema_ready.add(DB_FILE)
 
 
 def init_db() -> None:
@@ -112,50 +215,235 @@ def init_db() -> None:
             id TEXT PRIMARY KEY,
             dados TEXT
         );
+
+        -- Closure table for the regioes hierarchy (derived, not exported)
+        CREATE TABLE IF NOT EXISTS regioes_closure(
+            ancestor_id TEXT NOT NULL,
+            descendant_id TEXT NOT NULL,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY(ancestor_id, descendant_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_regioes_closure_descendant
+            ON regioes_closure(descendant_id, depth);
+        CREATE INDEX IF NOT EXISTS idx_assentamentos_regiao
+            ON assentamentos(regiao_id);
+
+        CREATE TRIGGER IF NOT EXISTS regioes_closure_ai AFTER INSERT ON regioes
+        BEGIN
+            INSERT INTO regioes_closure (ancestor_id, descendant_id, depth)
+            VALUES (NEW.id, NEW.id, 0);
+            INSERT INTO regioes_closure (ancestor_id, descendant_id, depth)
+            SELECT ancestor_id, NEW.id, depth + 1
+            FROM regioes_closure WHERE descendant_id = NEW.pai_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS regioes_closure_au AFTER UPDATE OF pai_id
+        ON regioes WHEN OLD.pai_id IS NOT NEW.pai_id
+        BEGIN
+            DELETE FROM regioes_closure
+            WHERE descendant_id IN (
+                SELECT descendant_id FROM regioes_closure WHERE ancestor_id = NEW.id
+            )
+            AND ancestor_id NOT IN (
+                SELECT descendant_id FROM regioes_closure WHERE ancestor_id = NEW.id
+            );
+            INSERT INTO regioes_closure (ancestor_id, descendant_id, depth)
+            SELECT sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1
+            FROM regioes_closure AS sup, regioes_closure AS sub
+            WHERE sup.descendant_id = NEW.pai_id AND sub.ancestor_id = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS regioes_closure_ad AFTER DELETE ON regioes
+        BEGIN
+            DELETE FROM regioes_closure
+            WHERE descendant_id = OLD.id OR ancestor_id = OLD.id;
+        END;
         """
     )
     conn.commit()
-    conn.close()
+    has_regions = cur.execute("SELECT 1 FROM regioes LIMIT 1").fetchone()
+    has_closure = cur.execute("SELECT 1 FROM regioes_closure LIMIT 1").fetchone()
+    if has_regions and not has_closure:
+        with transaction() as tx:
+            rebuild_region_closure(tx)
 
 
-def _register_entity(entity_type: str, name: str) -> str:
-    """Ensure entity with *name* has a stable UUID and return it."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT id FROM entity_registry WHERE type = ? AND name = ?",
-        (entity_type, name),
+def rebuild_region_closure(conn: sqlite3.Connection) -> None:
+    """Recompute ``regioes_closure`` from the ``pai_id`` adjacency list.
+
+    Needed after bulk loads that insert children before their parents. Paths
+    are capped at the number of regions so accidental cycles terminate.
+    """
+    conn.execute("DELETE FROM regioes_closure")
+    conn.execute(
+        """
+        WITH RECURSIVE tree(ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM regioes
+            UNION ALL
+            SELECT tree.ancestor_id, r.id, tree.depth + 1
+            FROM tree JOIN regioes AS r ON r.pai_id = tree.descendant_id
+            WHERE tree.depth < (SELECT COUNT(*) FROM regioes)
+        )
+        INSERT OR IGNORE INTO regioes_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM tree
+        """
     )
-    row = cur.fetchone()
-    if row:
-        conn.close()
-        return row[0]
-    entity_id = str(uuid.uuid4())
-    cur.execute(
-        "INSERT INTO entity_registry (id, type, name) VALUES (?, ?, ?)",
-        (entity_id, entity_type, name),
+
+
+class RegistryCache:
+    """Bounded LRU cache mapping ``(type, name)`` to entity registry ids.
+
+    Entries are filled lazily from ``entity_registry`` on lookup misses and
+    whenever new entities are registered. The cache is bound to one database
+    file and empties itself when :data:`DB_FILE` changes.
+    """
+
+    def __init__(self, maxsize: int = REGISTRY_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_file: Path | None = None
+
+    def _check_db(self) -> None:
+        if self._db_file != DB_FILE:
+            self._data.clear()
+            self._db_file = DB_FILE
+
+    def get(self, entity_type: str, name: str) -> str | None:
+        """Return the cached id for *name* or ``None`` on a miss."""
+        key = (entity_type, name)
+        with self._lock:
+            self._check_db()
+            entity_id = self._data.get(key)
+            if entity_id is not None:
+                self._data.move_to_end(key)
+            return entity_id
+
+    def put(self, entity_type: str, name: str, entity_id: str) -> None:
+        """Store *entity_id*, evicting the least recently used entries."""
+        with self._lock:
+            self._check_db()
+            self._data[(entity_type, name)] = entity_id
+            self._data.move_to_end((entity_type, name))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+registry_cache = RegistryCache()
+
+
+def _lookup_ids(
+    entity_type: str, names: list[str], conn: sqlite3.Connection
+) -> dict[str, str]:
+    """Return registry ids for the known names among *names*.
+
+    Cache misses are fetched with ``IN (...)`` lookups of up to
+    :data:`MAX_PARAMS` names and added to :data:`registry_cache`.
+    """
+    ids: dict[str, str] = {}
+    missing: list[str] = []
+    for name in names:
+        entity_id = registry_cache.get(entity_type, name)
+        if entity_id is None:
+            missing.append(name)
+        else:
+            ids[name] = entity_id
+    for start in range(0, len(missing), MAX_PARAMS):
+        chunk = missing[start : start + MAX_PARAMS]
+        placeholders = ",".join("?" * len(chunk))
+        cur = conn.execute(
+            "SELECT name, id FROM entity_registry "
+            f"WHERE type = ? AND name IN ({placeholders})",
+            (entity_type, *chunk),
+        )
+        for name, entity_id in cur.fetchall():
+            ids[name] = entity_id
+            registry_cache.put(entity_type, name, entity_id)
+    return ids
+
+
+def resolve_many(entity_type: str, names: Iterable[str]) -> dict[str, str]:
+    """Map every registered name in *names* to its id.
+
+    Unknown names are left out of the result; nothing is registered.
+    """
+    _ensure_schema()
+    return _lookup_ids(entity_type, list(dict.fromkeys(names)), get_connection())
+
+
+def _register_entity(
+    entity_type: str, name: str, conn: sqlite3.Connection | None = None
+) -> str:
+    """Ensure entity with *name* has a stable UUID and return it.
+
+    When *conn* is given the lookup and insert join the caller's transaction.
+    """
+    entity_id = registry_cache.get(entity_type, name)
+    if entity_id is not None:
+        return entity_id
+    if conn is None:
+        with transaction() as conn:
+            return _register_entities(entity_type, [name], conn)[name]
+    return _register_entities(entity_type, [name], conn)[name]
+
+
+def _register_entities(
+    entity_type: str, names: Iterable[str], conn: sqlite3.Connection
+) -> dict[str, str]:
+    """Return stable UUIDs for every name in *names*, registering new ones.
+
+    Known ids come from :func:`_lookup_ids` and missing ones are inserted in
+    one ``executemany`` call on *conn*.
+    """
+    unique = list(dict.fromkeys(names))
+    ids = _lookup_ids(entity_type, unique, conn)
+    new_rows = [(str(uuid.uuid4()), entity_type, n) for n in unique if n not in ids]
+    conn.executemany(
+        "INSERT INTO entity_registry (id, type, name) VALUES (?, ?, ?)", new_rows
     )
-    conn.commit()
-    conn.close()
-    return entity_id
+    for entity_id, _, name in new_rows:
+        ids[name] = entity_id
+        registry_cache.put(entity_type, name, entity_id)
+    return ids
 
 
 def create_governo(nome: str, tipo: str | None = None, nivel: str | None = None) -> str:
     """Create a government and return its id."""
-    init_db()
-    gid = _register_entity("governo", nome)
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT OR REPLACE INTO governos (id, nome, tipo, nivel) VALUES (?, ?, ?, ?)",
-        (gid, nome, tipo, nivel),
-    )
-    conn.commit()
-    conn.close()
-    export_json()
+    _ensure_schema()
+    with transaction() as conn:
+        gid = _register_entity("governo", nome, conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO governos (id, nome, tipo, nivel) VALUES (?, ?, ?, ?)",
+            (gid, nome, tipo, nivel),
+        )
+    mark_dirty("entity_registry", "governos")
     return gid
 
 
+def create_regiao(nome: str, pai_id: str | None = None) -> str:
+    """Create a region below *pai_id* and return its id."""
+    _ensure_schema()
+    with transaction() as conn:
+        rid = _register_entity("regiao", nome, conn)
+        conn.execute(
+            """
+            INSERT INTO regioes (id, nome, pai_id) VALUES (?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET nome = excluded.nome, pai_id = excluded.pai_id
+            """,
+            (rid, nome, pai_id),
+        )
+    mark_dirty("entity_registry", "regioes")
+    return rid
+
+
 def create_assentamento(
     nome: str,
     tipo: str | None = None,
@@ -165,21 +453,18 @@ def create_assentamento(
     imposto_base: float | None = None,
 ) -> str:
     """Create a settlement and return its id."""
-    init_db()
-    sid = _register_entity("assentamento", nome)
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT OR REPLACE INTO assentamentos
-        (id, nome, tipo, governo_id, regiao_id, independente, imposto_base)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-        (sid, nome, tipo, governo_id, regiao_id, int(independente), imposto_base),
-    )
-    conn.commit()
-    conn.close()
-    export_json()
+    _ensure_schema()
+    with transaction() as conn:
+        sid = _register_entity("assentamento", nome, conn)
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO assentamentos
+            (id, nome, tipo, governo_id, regiao_id, independente, imposto_base)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (sid, nome, tipo, governo_id, regiao_id, int(independente), imposto_base),
+        )
+    mark_dirty("entity_registry", "assentamentos")
     return sid
 
 
@@ -190,22 +475,360 @@ def create_planeta(
     governo_unico: bool = False,
 ) -> str:
     """Create a planet and return its id."""
-    init_db()
-    pid = _register_entity("planeta", nome)
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
+    _ensure_schema()
+    with transaction() as conn:
+        pid = _register_entity("planeta", nome, conn)
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO planetas
+            (id, nome, governo_id, recurso_principal, governo_unico)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (pid, nome, governo_id, recurso_principal, int(governo_unico)),
+        )
+    mark_dirty("entity_registry", "planetas")
+    return pid
+
+
+def create_governos_many(records: Iterable[Mapping[str, Any]]) -> list[str]:
+    """Create governments in one transaction and return their ids.
+
+    Each record takes the keyword arguments of :func:`create_governo`.
+    """
+    records = list(records)
+    _ensure_schema()
+    with transaction() as conn:
+        ids = _register_entities("governo", (r["nome"] for r in records), conn)
+        conn.executemany(
+            "INSERT OR REPLACE INTO governos (id, nome, tipo, nivel) VALUES (?, ?, ?, ?)",
+            [
+                (ids[r["nome"]], r["nome"], r.get("tipo"), r.get("nivel"))
+                for r in records
+            ],
+        )
+    mark_dirty("entity_registry", "governos")
+    return [ids[r["nome"]] for r in records]
+
+
+def create_assentamentos_many(records: Iterable[Mapping[str, Any]]) -> list[str]:
+    """Create settlements in one transaction and return their ids.
+
+    Each record takes the keyword arguments of :func:`create_assentamento`.
+    """
+    records = list(records)
+    _ensure_schema()
+    with transaction() as conn:
+        ids = _register_entities("assentamento", (r["nome"] for r in records), conn)
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO assentamentos
+            (id, nome, tipo, governo_id, regiao_id, independente, imposto_base)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    ids[r["nome"]],
+                    r["nome"],
+                    r.get("tipo"),
+                    r.get("governo_id"),
+                    r.get("regiao_id"),
+                    int(r.get("independente", False)),
+                    r.get("imposto_base"),
+                )
+                for r in records
+            ],
+        )
+    mark_dirty("entity_registry", "assentamentos")
+    return [ids[r["nome"]] for r in records]
+
+
+def create_planetas_many(records: Iterable[Mapping[str, Any]]) -> list[str]:
+    """Create planets in one transaction and return their ids.
+
+    Each record takes the keyword arguments of :func:`create_planeta`.
+    """
+    records = list(records)
+    _ensure_schema()
+    with transaction() as conn:
+        ids = _register_entities("planeta", (r["nome"] for r in records), conn)
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO planetas
+            (id, nome, governo_id, recurso_principal, governo_unico)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    ids[r["nome"]],
+                    r["nome"],
+                    r.get("governo_id"),
+                    r.get("recurso_principal"),
+                    int(r.get("governo_unico", False)),
+                )
+                for r in records
+            ],
+        )
+    mark_dirty("entity_registry", "planetas")
+    return [ids[r["nome"]] for r in records]
+
+
+def diplomacy_index() -> DiplomacyIndex:
+    """Return the shared diplomacy index, loading it on first use.
+
+    The index is refreshed incrementally by :func:`create_relacao`,
+    :func:`remove_relacao`, :func:`add_liga_membro` and
+    :func:`remove_liga_membro`.
+    """
+    global _diplomacy
+    with _diplomacy_lock:
+        if _diplomacy is None or _diplomacy[0] != DB_FILE:
+            _ensure_schema()
+            _diplomacy = (DB_FILE, DiplomacyIndex.load(get_connection()))
+        return _diplomacy[1]
+
+
+def reset_diplomacy_index() -> None:
+    """Discard the shared diplomacy index so the next use reloads it."""
+    global _diplomacy
+    with _diplomacy_lock:
+        _diplomacy = None
+
+
+def _loaded_diplomacy_index() -> DiplomacyIndex | None:
+    if _diplomacy is not None and _diplomacy[0] == DB_FILE:
+        return _diplomacy[1]
+    return None
+
+
+def create_relacao(
+    governo_a: str, governo_b: str, relacao: str, tratado: str | None = None
+) -> str:
+    """Record a relation such as ``"aliança"`` or ``"guerra"`` and return its id."""
+    _ensure_schema()
+    rel_id = str(uuid.uuid4())
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO relacoes_governamentais
+            (id, governo_a, governo_b, relacao, tratado)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (rel_id, governo_a, governo_b, relacao, tratado),
+        )
+    index = _loaded_diplomacy_index()
+    if index is not None:
+        index.add_relation(rel_id, governo_a, governo_b, relacao)
+    mark_dirty("relacoes_governamentais")
+    return rel_id
+
+
+def remove_relacao(relacao_id: str) -> None:
+    """Delete a relation between governments."""
+    _ensure_schema()
+    with transaction() as conn:
+        conn.execute(
+            "DELETE FROM relacoes_governamentais WHERE id = ?", (relacao_id,)
+        )
+    index = _loaded_diplomacy_index()
+    if index is not None:
+        index.remove_relation(relacao_id)
+    mark_dirty("relacoes_governamentais")
+
+
+def create_liga(nome: str) -> str:
+    """Create a league and return its id."""
+    _ensure_schema()
+    with transaction() as conn:
+        lid = _register_entity("liga", nome, conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO ligas (id, nome) VALUES (?, ?)", (lid, nome)
+        )
+    mark_dirty("entity_registry", "ligas")
+    return lid
+
+
+def add_liga_membro(liga_id: str, governo_id: str) -> None:
+    """Add a government to a league."""
+    _ensure_schema()
+    with transaction() as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO liga_membros (liga_id, governo_id) VALUES (?, ?)",
+            (liga_id, governo_id),
+        )
+    index = _loaded_diplomacy_index()
+    if index is not None:
+        index.add_member(liga_id, governo_id)
+    mark_dirty("liga_membros")
+
+
+def remove_liga_membro(liga_id: str, governo_id: str) -> None:
+    """Remove a government from a league."""
+    _ensure_schema()
+    with transaction() as conn:
+        conn.execute(
+            "DELETE FROM liga_membros WHERE liga_id = ? AND governo_id = ?",
+            (liga_id, governo_id),
+        )
+    index = _loaded_diplomacy_index()
+    if index is not None:
+        index.remove_member(liga_id, governo_id)
+    mark_dirty("liga_membros")
+
+
+def regiao_ancestors(regiao_id: str) -> list[str]:
+    """Return the ancestors of a region, nearest first."""
+    _ensure_schema()
+    cur = get_connection().execute(
         """
-        INSERT OR REPLACE INTO planetas
-        (id, nome, governo_id, recurso_principal, governo_unico)
-        VALUES (?, ?, ?, ?, ?)
+        SELECT ancestor_id FROM regioes_closure
+        WHERE descendant_id = ? AND depth > 0 ORDER BY depth
         """,
-        (pid, nome, governo_id, recurso_principal, int(governo_unico)),
+        (regiao_id,),
     )
-    conn.commit()
-    conn.close()
-    export_json()
-    return pid
+    return [row[0] for row in cur.fetchall()]
+
+
+def regiao_descendants(regiao_id: str) -> list[str]:
+    """Return every region below *regiao_id*, closest levels first."""
+    _ensure_schema()
+    cur = get_connection().execute(
+        """
+        SELECT descendant_id FROM regioes_closure
+        WHERE ancestor_id = ? AND depth > 0 ORDER BY depth
+        """,
+        (regiao_id,),
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def regiao_settlement_count(regiao_id: str) -> int:
+    """Count the settlements in a region and all of its subregions."""
+    _ensure_schema()
+    cur = get_connection().execute(
+        """
+        SELECT COUNT(*) FROM regioes_closure AS c
+        JOIN assentamentos AS a ON a.regiao_id = c.descendant_id
+        WHERE c.ancestor_id = ?
+        """,
+        (regiao_id,),
+    )
+    return cur.fetchone()[0]
+
+
+def regiao_tax_total(regiao_id: str) -> float:
+    """Sum ``imposto_base`` of the settlements in a region's subtree."""
+    _ensure_schema()
+    cur = get_connection().execute(
+        """
+        SELECT COALESCE(SUM(a.imposto_base), 0) FROM regioes_closure AS c
+        JOIN assentamentos AS a ON a.regiao_id = c.descendant_id
+        WHERE c.ancestor_id = ?
+        """,
+        (regiao_id,),
+    )
+    return float(cur.fetchone()[0])
+
+
+def configure_export(
+    mode: str | None = None,
+    layout: str | None = None,
+    delay: float | None = None,
+) -> None:
+    """Change how the JSON mirror follows database writes.
+
+    *mode* is ``"immediate"`` (rewrite after every write), ``"debounced"``
+    (flush in the background once writes stop for *delay* seconds) or
+    ``"off"``. *layout* selects between the single ``combined`` file and one
+    file per table (``per_table``), where only changed tables are rewritten.
+    """
+    global EXPORT_MODE, EXPORT_LAYOUT, EXPORT_DELAY
+    if mode is not None:
+        if mode not in {"immediate", "debounced", "off"}:
+            raise ValueError(f"Unknown export mode: {mode}")
+        EXPORT_MODE = mode
+    if layout is not None:
+        if layout not in {"combined", "per_table"}:
+            raise ValueError(f"Unknown export layout: {layout}")
+        EXPORT_LAYOUT = layout
+    if delay is not None:
+        EXPORT_DELAY = delay
+
+
+def mark_dirty(*tables: str) -> None:
+    """Record that *tables* changed and schedule the JSON mirror update.
+
+    Inside an open :func:`transaction` the tables are held back until the
+    outermost level commits, and forgotten if it rolls back, so the mirror
+    never contains uncommitted rows.
+    """
+    if _pool.depth:
+        _pending_tables().update(tables)
+        return
+    _schedule_export(tables)
+
+
+def _pending_tables() -> set[str]:
+    pending = getattr(_pending, "tables", None)
+    if pending is None:
+        pending = _pending.tables = set()
+    return pending
+
+
+def _schedule_export(tables: Iterable[str]) -> None:
+    global _export_deadline, _exporter
+    with _export_lock:
+        _dirty_tables.update(tables)
+        if EXPORT_MODE == "immediate":
+            flush_export()
+        elif EXPORT_MODE == "debounced":
+            _export_deadline = time.monotonic() + EXPORT_DELAY
+            if _exporter is None or not _exporter.is_alive():
+                _exporter = threading.Thread(
+                    target=_export_loop, name="json-export", daemon=True
+                )
+                _exporter.start()
+            _export_wakeup.set()
+
+
+def _export_loop() -> None:
+    """Flush the mirror once no write has pushed the deadline back.
+
+    A single long-lived thread serves every debounced write, so the export
+    reuses one pooled connection instead of opening one per flush.
+    """
+    while True:
+        with _export_lock:
+            deadline = _export_deadline
+            _export_wakeup.clear()
+        if deadline is None:
+            _export_wakeup.wait()
+            continue
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            _export_wakeup.wait(remaining)
+            continue
+        flush_export()
+
+
+def flush_export() -> None:
+    """Write pending changes to the JSON mirror right away."""
+    global _export_deadline
+    with _export_lock:
+        _export_deadline = None
+        if not _dirty_tables:
+            return
+        dirty = sorted(_dirty_tables)
+        _dirty_tables.clear()
+        if EXPORT_LAYOUT == "per_table":
+            export_tables(dirty)
+        else:
+            export_json()
+
+
+def _select_table(cur: sqlite3.Cursor, table: str) -> list[dict[str, Any]]:
+    cur.execute(f"SELECT * FROM {table}")
+    cols = [c[0] for c in cur.description]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
 
 
 def export_json(file_path: Path | None = None) -> None:
@@ -214,47 +837,159 @@ def export_json(file_path: Path | None = None) -> None:
     conn = get_connection()
     cur = conn.cursor()
     data: dict[str, list[dict[str, Any]]] = {}
-    tables = [
-        "entity_registry",
-        "governos",
-        "regioes",
-        "assentamentos",
-        "relacoes_governamentais",
-        "ligas",
-        "liga_membros",
-        "planetas",
-        "planeta_cidades",
-        "personagens",
-        "economia",
-        "grupos",
-        "timeline",
-    ]
-    for table in tables:
-        cur.execute(f"SELECT * FROM {table}")
-        cols = [c[0] for c in cur.description]
-        data[table] = [dict(zip(cols, row)) for row in cur.fetchall()]
-    conn.close()
+    for table in TABLES:
+        data[table] = _select_table(cur, table)
     file_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
 
 
-def import_json(file_path: Path | None = None) -> None:
-    """Import data from JSON file into SQLite, replacing existing rows."""
+def export_tables(
+    tables: list[str] | None = None, directory: Path | None = None
+) -> None:
+    """Export *tables* to one ``<table>.json`` file each inside *directory*.
+
+    The directory defaults to :data:`JSON_EXPORT` without its suffix. All
+    tables are written when *tables* is ``None``.
+    """
+    directory = directory or JSON_EXPORT.with_suffix("")
+    directory.mkdir(parents=True, exist_ok=True)
+    cur = get_connection().cursor()
+    for table in tables or TABLES:
+        rows = _select_table(cur, table)
+        (directory / f"{table}.json").write_text(
+            json.dumps(rows, indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+
+
+class _ExportReader:
+    """Incremental reader for ``{"table": [{...}, ...], ...}`` documents.
+
+    Only one row object is decoded at a time, so memory use is bounded by the
+    read buffer and the largest row instead of the whole document.
+    """
+
+    def __init__(self, fh: IO[str], read_size: int = 1 << 16) -> None:
+        self._fh = fh
+        self._read_size = read_size
+        self._buf = ""
+        self._pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self._fh.read(self._read_size)
+        if not chunk:
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _next_char(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON export")
+
+    def _expect(self, chars: str) -> str:
+        char = self._next_char()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in JSON export, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _value(self) -> Any:
+        self._next_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            self._pos = end
+            return value
+
+    def rows(self) -> Iterator[tuple[str, dict[str, Any] | None]]:
+        """Yield ``(table, row)`` pairs; empty tables yield ``(table, None)``."""
+        self._expect("{")
+        if self._next_char() == "}":
+            return
+        while True:
+            table = self._value()
+            self._expect(":")
+            self._expect("[")
+            if self._next_char() == "]":
+                self._pos += 1
+                yield table, None
+            else:
+                while True:
+                    yield table, self._value()
+                    if self._expect(",]") == "]":
+                        break
+            if self._expect(",}") == "}":
+                return
+
+
+def _insert_batch(
+    cur: sqlite3.Cursor, table: str, cols: list[str], rows: list[dict[str, Any]]
+) -> None:
+    placeholders = ",".join(["?" for _ in cols])
+    cur.executemany(
+        f"INSERT INTO {table} ({','.join(cols)}) VALUES ({placeholders})",
+        [[row[c] for c in cols] for row in rows],
+    )
+
+
+def import_json(
+    file_path: Path | None = None,
+    batch_size: int = 1000,
+    progress: Callable[[str, int], None] | None = None,
+) -> dict[str, int]:
+    """Import data from JSON file into SQLite, replacing existing rows.
+
+    The export is parsed incrementally and rows are inserted with
+    ``executemany`` in batches of *batch_size*. *progress* is called with the
+    table name and the number of rows imported so far after every batch.
+    Returns the number of rows imported per table.
+    """
     file_path = file_path or JSON_EXPORT
+    counts: dict[str, int] = {}
     if not file_path.exists():
-        return
-    data = json.loads(file_path.read_text(encoding="utf-8"))
-    conn = get_connection()
-    cur = conn.cursor()
-    for table, rows in data.items():
-        if not rows:
-            continue
-        cols = rows[0].keys()
-        placeholders = ",".join(["?" for _ in cols])
-        cur.execute(f"DELETE FROM {table}")
-        for row in rows:
-            cur.execute(
-                f"INSERT INTO {table} ({','.join(cols)}) VALUES ({placeholders})",
-                [row[c] for c in cols],
-            )
-    conn.commit()
-    conn.close()
+        return counts
+    _ensure_schema()
+    registry_cache.clear()
+    reset_diplomacy_index()
+    with file_path.open("r", encoding="utf-8") as fh, transaction() as conn:
+        cur = conn.cursor()
+        table: str | None = None
+        cols: list[str] = []
+        batch: list[dict[str, Any]] = []
+
+        def flush() -> None:
+            if table is None or not batch:
+                return
+            _insert_batch(cur, table, cols, batch)
+            counts[table] += len(batch)
+            batch.clear()
+            if progress is not None:
+                progress(table, counts[table])
+
+        for name, row in _ExportReader(fh).rows():
+            if row is None:
+                continue
+            if name != table:
+                flush()
+                table, cols = name, list(row.keys())
+                counts[table] = 0
+                cur.execute(f"DELETE FROM {table}")
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        if "regioes" in counts:
+            rebuild_region_closure(conn)
+    return counts
+
+
+atexit.register(flush_export)
@@ -0,0 +1,117 @@
+"""In-memory index of diplomatic relations between governments.
+
+The index mirrors ``relacoes_governamentais`` and ``liga_membros`` as plain
+adjacency dictionaries so graph questions such as "allies within *k* hops"
+are answered without touching SQLite. :mod:`data.db` keeps the shared index
+current as relations and league memberships are written.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections import Counter, defaultdict, deque
+
+ALIANCA = "aliança"
+GUERRA = "guerra"
+
+
+class DiplomacyIndex:
+    """Adjacency index of governments keyed by relation type."""
+
+    def __init__(self) -> None:
+        # relation type -> government -> neighbour -> number of relation rows
+        self._adj: dict[str, dict[str, Counter[str]]] = defaultdict(
+            lambda: defaultdict(Counter)
+        )
+        self._relations: dict[str, tuple[str, str, str]] = {}
+        self._members: dict[str, set[str]] = defaultdict(set)
+        self._leagues_of: dict[str, set[str]] = defaultdict(set)
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> DiplomacyIndex:
+        """Build an index from the tables reachable through *conn*."""
+        index = cls()
+        for rel_id, a, b, relacao in conn.execute(
+            "SELECT id, governo_a, governo_b, relacao FROM relacoes_governamentais"
+        ):
+            index.add_relation(rel_id, a, b, relacao)
+        for liga_id, governo_id in conn.execute(
+            "SELECT liga_id, governo_id FROM liga_membros"
+        ):
+            index.add_member(liga_id, governo_id)
+        return index
+
+    # -- incremental updates -------------------------------------------
+    def add_relation(
+        self, relation_id: str, governo_a: str, governo_b: str, relacao: str | None
+    ) -> None:
+        """Register relation row *relation_id*, replacing any previous version."""
+        self.remove_relation(relation_id)
+        kind = (relacao or "").strip().lower()
+        self._relations[relation_id] = (governo_a, governo_b, kind)
+        self._adj[kind][governo_a][governo_b] += 1
+        self._adj[kind][governo_b][governo_a] += 1
+
+    def remove_relation(self, relation_id: str) -> None:
+        """Forget relation row *relation_id* if it is indexed."""
+        entry = self._relations.pop(relation_id, None)
+        if entry is None:
+            return
+        a, b, kind = entry
+        for x, y in ((a, b), (b, a)):
+            nbrs = self._adj[kind][x]
+            nbrs[y] -= 1
+            if nbrs[y] <= 0:
+                del nbrs[y]
+
+    def add_member(self, liga_id: str, governo_id: str) -> None:
+        """Record that *governo_id* belongs to league *liga_id*."""
+        self._members[liga_id].add(governo_id)
+        self._leagues_of[governo_id].add(liga_id)
+
+    def remove_member(self, liga_id: str, governo_id: str) -> None:
+        """Remove *governo_id* from league *liga_id*."""
+        self._members[liga_id].discard(governo_id)
+        self._leagues_of[governo_id].discard(liga_id)
+
+    # -- queries ---------------------------------------------------------
+    def neighbours(self, governo_id: str, relacao: str) -> set[str]:
+        """Return governments directly linked to *governo_id* by *relacao*."""
+        return set(self._adj[relacao.lower()].get(governo_id, ()))
+
+    def allies_within(self, governo_id: str, hops: int) -> set[str]:
+        """Return governments reachable through at most *hops* alliances."""
+        allies = self._adj[ALIANCA]
+        seen = {governo_id}
+        queue = deque([(governo_id, 0)])
+        while queue:
+            node, dist = queue.popleft()
+            if dist == hops:
+                continue
+            for other in allies.get(node, ()):
+                if other not in seen:
+                    seen.add(other)
+                    queue.append((other, dist + 1))
+        seen.discard(governo_id)
+        return seen
+
+    def shared_leagues(self, governo_a: str, governo_b: str) -> set[str]:
+        """Return the leagues both governments are members of."""
+        return self._leagues_of.get(governo_a, set()) & self._leagues_of.get(
+            governo_b, set()
+        )
+
+    def members(self, liga_id: str) -> set[str]:
+        """Return the member governments of *liga_id*."""
+        return set(self._members.get(liga_id, ()))
+
+    def at_war_with_league(self, liga_id: str) -> set[str]:
+        """Return governments at war with any member of league *liga_id*."""
+        wars = self._adj[GUERRA]
+        enemies: set[str] = set()
+        for member in self._members.get(liga_id, ()):
+            enemies.update(wars.get(member, ()))
+        return enemies
+
+
+__all__ = ["ALIANCA", "GUERRA", "DiplomacyIndex"]
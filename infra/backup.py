@@ -0,0 +1,259 @@
+"""Online, rotating backups of SQLite database files.
+
+Backups are taken with :meth:`sqlite3.Connection.backup` so they are
+consistent even while the application holds the database open. They can be
+stored as plain ``.db`` copies or, with *dedupe* enabled, as JSON manifests
+referencing content-addressed blocks shared between backups so unchanged
+parts of a large world are only stored once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+BLOCK_SIZE = 1 << 16
+_NAME_RE = re.compile(r"^(?P<stem>.+)-(?P<ts>\d{8}-\d{6})\.(?:db|json)$")
+_TS_FORMAT = "%Y%m%d-%H%M%S"
+
+
+@dataclass
+class RetentionPolicy:
+    """Number of hourly, daily and weekly backups to keep."""
+
+    hourly: int = 24
+    daily: int = 7
+    weekly: int = 4
+
+
+def online_copy(src: Path, dest: Path, pages: int = 256) -> None:
+    """Copy database *src* into *dest* in batches of *pages* pages."""
+    src_conn = sqlite3.connect(src)
+    dest_conn = sqlite3.connect(dest)
+    try:
+        src_conn.backup(dest_conn, pages=pages)
+    finally:
+        dest_conn.close()
+        src_conn.close()
+
+
+def _store_blocks(path: Path, blocks_dir: Path) -> list[str]:
+    """Split *path* into blocks stored by SHA-256 and return their hashes."""
+    hashes: list[str] = []
+    with path.open("rb") as fh:
+        while block := fh.read(BLOCK_SIZE):
+            digest = hashlib.sha256(block).hexdigest()
+            target = blocks_dir / digest[:2] / digest
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(block)
+            hashes.append(digest)
+    return hashes
+
+
+def list_backups(backup_dir: Path, stem: str) -> list[tuple[datetime, Path]]:
+    """Return backups of the database named *stem*, newest first."""
+    found: list[tuple[datetime, Path]] = []
+    if not backup_dir.exists():
+        return found
+    for path in backup_dir.iterdir():
+        match = _NAME_RE.match(path.name)
+        if match and match["stem"] == stem:
+            found.append((datetime.strptime(match["ts"], _TS_FORMAT), path))
+    found.sort(reverse=True)
+    return found
+
+
+def create_backup(
+    db_path: Path,
+    backup_dir: Path,
+    *,
+    dedupe: bool = False,
+    pages: int = 256,
+    now: datetime | None = None,
+) -> Path | None:
+    """Back up *db_path* into *backup_dir* and return the new backup file.
+
+    With *dedupe* the copy is stored as a manifest of shared blocks and no
+    backup is written when nothing changed since the latest one; ``None`` is
+    returned in that case and when the database does not exist.
+    """
+    if not db_path.exists():
+        return None
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    ts = (now or datetime.now()).strftime(_TS_FORMAT)
+    stem = db_path.stem
+    if not dedupe:
+        dest = backup_dir / f"{stem}-{ts}.db"
+        online_copy(db_path, dest, pages)
+        return dest
+
+    tmp = backup_dir / f".{stem}-{ts}.tmp"
+    online_copy(db_path, tmp, pages)
+    try:
+        blocks = _store_blocks(tmp, backup_dir / "blocks")
+    finally:
+        tmp.unlink(missing_ok=True)
+    manifests = [p for _, p in list_backups(backup_dir, stem) if p.suffix == ".json"]
+    if manifests:
+        latest = json.loads(manifests[0].read_text(encoding="utf-8"))
+        if latest["blocks"] == blocks:
+            return None
+    dest = backup_dir / f"{stem}-{ts}.json"
+    manifest = {"source": db_path.name, "block_size": BLOCK_SIZE, "blocks": blocks}
+    dest.write_text(json.dumps(manifest), encoding="utf-8")
+    return dest
+
+
+def restore_backup(backup: Path, dest: Path) -> None:
+    """Recreate the database stored in *backup* at *dest*."""
+    if backup.suffix == ".db":
+        online_copy(backup, dest)
+        return
+    manifest = json.loads(backup.read_text(encoding="utf-8"))
+    blocks_dir = backup.parent / "blocks"
+    with dest.open("wb") as fh:
+        for digest in manifest["blocks"]:
+            fh.write((blocks_dir / digest[:2] / digest).read_bytes())
+
+
+def prune_backups(
+    backup_dir: Path,
+    policy: RetentionPolicy,
+    stem: str,
+) -> list[Path]:
+    """Delete backups not kept by *policy* and return the removed files.
+
+    The newest backup of each of the last ``policy.hourly`` hours,
+    ``policy.daily`` days and ``policy.weekly`` ISO weeks is kept, as is the
+    most recent backup overall. Blocks no longer referenced by any manifest
+    are removed too.
+    """
+    backups = list_backups(backup_dir, stem)
+    keep: set[Path] = {backups[0][1]} if backups else set()
+    buckets = (
+        (policy.hourly, lambda ts: ts.strftime("%Y%m%d%H")),
+        (policy.daily, lambda ts: ts.strftime("%Y%m%d")),
+        (policy.weekly, lambda ts: "%d-%02d" % ts.isocalendar()[:2]),
+    )
+    for limit, bucket_of in buckets:
+        seen: set[str] = set()
+        for ts, path in backups:
+            bucket = bucket_of(ts)
+            if bucket in seen:
+                continue
+            if len(seen) >= limit:
+                break
+            seen.add(bucket)
+            keep.add(path)
+
+    removed = [path for _, path in backups if path not in keep]
+    for path in removed:
+        path.unlink(missing_ok=True)
+    if removed:
+        _collect_blocks(backup_dir)
+    return removed
+
+
+def _collect_blocks(backup_dir: Path) -> None:
+    """Delete blocks that no manifest in *backup_dir* references."""
+    blocks_dir = backup_dir / "blocks"
+    if not blocks_dir.exists():
+        return
+    referenced: set[str] = set()
+    for manifest in backup_dir.glob("*.json"):
+        referenced.update(json.loads(manifest.read_text(encoding="utf-8"))["blocks"])
+    for block in blocks_dir.glob("*/*"):
+        if block.name not in referenced:
+            block.unlink()
+
+
+class BackupScheduler:
+    """Take rotated backups of a database on a background thread."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        backup_dir: Path,
+        interval: float,
+        policy: RetentionPolicy | None = None,
+        dedupe: bool = False,
+    ) -> None:
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.interval = interval
+        self.policy = policy or RetentionPolicy()
+        self.dedupe = dedupe
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> Path | None:
+        """Take one backup now and apply the retention policy."""
+        with self._lock:
+            path = create_backup(self.db_path, self.backup_dir, dedupe=self.dedupe)
+            prune_backups(self.backup_dir, self.policy, self.db_path.stem)
+            return path
+
+    def is_current(self, now: datetime | None = None) -> bool:
+        """Return whether a new backup would be redundant.
+
+        That is the case when the latest backup is younger than the interval
+        or the database and its WAL file have not changed since it was taken.
+        """
+        backups = list_backups(self.backup_dir, self.db_path.stem)
+        if not backups:
+            return False
+        taken, latest = backups[0]
+        if (now or datetime.now()) - taken < timedelta(seconds=self.interval):
+            return True
+        backed_up = latest.stat().st_mtime
+        wal = self.db_path.with_name(self.db_path.name + "-wal")
+        return all(
+            not path.exists() or path.stat().st_mtime <= backed_up
+            for path in (self.db_path, wal)
+        )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                # A locked database or a full disk must not end the schedule.
+                logger.exception("Scheduled backup of %s failed", self.db_path)
+
+    def start(self) -> None:
+        """Start the background thread if it is not running yet."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-backup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread, waiting for a running backup."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+__all__ = [
+    "BackupScheduler",
+    "RetentionPolicy",
+    "create_backup",
+    "list_backups",
+    "online_copy",
+    "prune_backups",
+    "restore_backup",
+]
@@ -0,0 +1,76 @@
+"""Coherence checks computed inside SQLite.
+
+Mirrors :func:`core.coherence.generate_report` without hydrating models:
+each check is a single aggregate query and only offending rows are read
+back, streamed from the cursor.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Iterator
+
+from core.coherence import CharacterOverlap, CoherenceReport
+
+
+def _scope(column: str, project_id: str | None) -> tuple[str, tuple[Any, ...]]:
+    if project_id is None:
+        return "", ()
+    return f"WHERE {column} = ?", (project_id,)
+
+
+def iter_character_overlaps(
+    conn: sqlite3.Connection, project_id: str | None = None
+) -> Iterator[CharacterOverlap]:
+    """Yield characters placed at several locations within the same year.
+
+    Uses the ``timeline_event_characters`` and ``timeline_event_locations``
+    join tables rather than parsing the comma separated columns.
+    """
+    where, params = _scope("e.project_id", project_id)
+    cur = conn.execute(
+        "SELECT c.character_id, e.year, group_concat(DISTINCT l.location_id) "
+        "FROM timeline_event_characters AS c "
+        "JOIN timeline_event_locations AS l ON l.event_id = c.event_id "
+        f"JOIN timeline_events AS e ON e.id = c.event_id {where} "
+        "GROUP BY c.character_id, e.year "
+        "HAVING COUNT(DISTINCT l.location_id) > 1 "
+        "ORDER BY c.character_id, e.year",
+        params,
+    )
+    for character, year, locations in cur:
+        yield CharacterOverlap(character, year, sorted(locations.split(",")))
+
+
+def iter_duplicate_factions(
+    conn: sqlite3.Connection, project_id: str | None = None
+) -> Iterator[str]:
+    """Yield faction names used more than once, in order of the first repeat."""
+    where, params = _scope("project_id", project_id)
+    cur = conn.execute(
+        "SELECT name FROM ("
+        "SELECT id, name, ROW_NUMBER() OVER (PARTITION BY name ORDER BY id) AS n "
+        f"FROM factions {where}) WHERE n = 2 ORDER BY id",
+        params,
+    )
+    for (name,) in cur:
+        yield name
+
+
+def generate_report(
+    conn: sqlite3.Connection, project_id: str | None = None
+) -> CoherenceReport:
+    """Run every check against *conn*, optionally limited to *project_id*."""
+    return CoherenceReport(
+        # timeline_events.id is the primary key, so no event has two years.
+        conflicting_dates=[],
+        character_overlaps=list(iter_character_overlaps(conn, project_id)),
+        duplicate_factions=list(iter_duplicate_factions(conn, project_id)),
+    )
+
+
+__all__ = [
+    "generate_report",
+    "iter_character_overlaps",
+    "iter_duplicate_factions",
+]
@@ -3,49 +3,115 @@ from __future__ import annotations
 
 import atexit
 import sqlite3
-from datetime import datetime
+import time
+from functools import lru_cache
 from pathlib import Path
 from contextlib import contextmanager
 
 from config import settings
+from infra.backup import BackupScheduler, RetentionPolicy
+from infra import tracing
+from infra.repositories.identity_map import commit_pending, discard_pending
+from infra.sqlite_pool import ConnectionPool
+from infra.sqlite_profile import apply_profile
 
 BASE_DIR = settings.workspace
 DB_PATH = BASE_DIR / "app.db"
 MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
 BACKUP_DIR = BASE_DIR / "backups"
+BACKUP_POLICY = RetentionPolicy()
+SLOW_QUERY_LOG = BASE_DIR / "slow_queries.log"
+
+
+_pool = ConnectionPool()
+
+
+def _open(path: Path) -> sqlite3.Connection:
+    BASE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, factory=tracing.TracedConnection)
+    conn.row_factory = sqlite3.Row
+    apply_profile(conn)
+    _ensure_schema(conn)
+    return conn
 
 
 def connect(seed: bool = False) -> sqlite3.Connection:
-    """Return a SQLite connection ensuring migrations are applied.
+    """Return the current thread's SQLite connection, creating it on demand.
+
+    Connections are pooled per thread and database path. Migrations are only
+    checked when a connection is opened, and skipped entirely when the
+    schema version recorded in ``PRAGMA user_version`` is current.
 
     If *seed* is ``True`` demo data will be inserted when the database is
     empty.
     """
-    BASE_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    _run_migrations(conn)
+    conn = _pool.get(DB_PATH, _open)
     if seed:
         seed_demo(conn)
     return conn
 
 
+def close_connections() -> None:
+    """Close every pooled connection owned by the current thread."""
+    _pool.close_all()
+
+
 @contextmanager
-def transaction(seed: bool = False):
+def transaction(seed: bool = False, label: str | None = None):
     """Yield a database connection wrapped in a transaction.
 
-    Commits the transaction on successful exit and rolls back if an
-    exception occurs. A fresh connection is provided for each usage.
+    Commits the transaction on successful exit and rolls back however else
+    the block is left, then drops what identity maps cached meanwhile. The
+    thread's pooled connection is reused; nested usages join the outermost
+    transaction, which alone commits.
+
+    While query tracing is enabled the duration of the outermost transaction
+    is recorded as ``TRANSACTION <label>`` next to its statements.
     """
     conn = connect(seed=seed)
+    outermost = _pool.depth == 0
+    start = time.perf_counter()
     try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
+        with _pool.transaction(
+            conn, on_commit=commit_pending, on_rollback=discard_pending
+        ):
+            yield conn
     finally:
-        conn.close()
+        if outermost and tracing.recorder is not None:
+            elapsed = (time.perf_counter() - start) * 1000
+            tracing.recorder.record(f"TRANSACTION {label or ''}", elapsed)
+
+
+def enable_tracing(slow_threshold_ms: float | None = None) -> tracing.QueryRecorder:
+    """Start recording statement statistics for all connections.
+
+    Statements slower than *slow_threshold_ms* are appended to
+    :data:`SLOW_QUERY_LOG`.
+    """
+    BASE_DIR.mkdir(parents=True, exist_ok=True)
+    return tracing.enable_tracing(
+        tracing.QueryRecorder(slow_threshold_ms, SLOW_QUERY_LOG)
+    )
+
+
+def query_stats() -> list[tracing.StatementStats]:
+    """Return the statistics collected since tracing was enabled."""
+    return tracing.recorder.stats() if tracing.recorder is not None else []
+
+
+@lru_cache(maxsize=None)
+def _migration_files(migrations_dir: Path) -> tuple[Path, ...]:
+    return tuple(sorted(migrations_dir.glob("*.sql")))
+
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+    """Run migrations unless ``user_version`` shows they are all applied."""
+    expected = len(_migration_files(MIGRATIONS_DIR))
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version == expected:
+        return
+    _run_migrations(conn)
+    conn.execute(f"PRAGMA user_version = {expected}")
 
 
 def _run_migrations(conn: sqlite3.Connection) -> None:
@@ -56,7 +122,7 @@ def _run_migrations(conn: sqlite3.Connection) -> None:
     applied = {
         row["id"] for row in conn.execute("SELECT id FROM schema_migrations")
     }
-    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+    for path in _migration_files(MIGRATIONS_DIR):
         mig_id = path.stem
         if mig_id in applied:
             continue
@@ -115,18 +181,49 @@ def seed_demo(conn: sqlite3.Connection) -> None:
             ),
             ("evt-1", "Founding", 0, None, "local", "Founding", "", "Springfield", "Guild"),
         )
+        cur.execute(
+            "INSERT INTO timeline_event_locations (event_id, location_id) VALUES (?, ?)",
+            ("evt-1", "Springfield"),
+        )
+        cur.execute(
+            "INSERT INTO timeline_event_tags (event_id, tag) VALUES (?, ?)",
+            ("evt-1", "Guild"),
+        )
 
     conn.commit()
 
 
+_scheduler: BackupScheduler | None = None
+
+
+def _backup_scheduler() -> BackupScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = BackupScheduler(
+            DB_PATH,
+            BACKUP_DIR,
+            interval=settings.backup_interval,
+            policy=BACKUP_POLICY,
+            dedupe=settings.backup_dedupe,
+        )
+    return _scheduler
+
+
+def start_backups() -> None:
+    """Start periodic background backups of the database."""
+    if settings.backup_interval > 0:
+        _backup_scheduler().start()
+
+
 def _backup() -> None:
-    """Create a timestamped backup of the database file."""
-    if not DB_PATH.exists():
-        return
-    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-    dest = BACKUP_DIR / f"app-{ts}.db"
-    dest.write_bytes(DB_PATH.read_bytes())
+    """Stop scheduled backups and take a final one unless the latest is current."""
+    scheduler = _backup_scheduler()
+    scheduler.stop()
+    if not scheduler.is_current():
+        scheduler.run_once()
 
 
 atexit.register(_backup)
+
+if settings.db_trace:
+    enable_tracing(settings.db_slow_ms)
@@ -0,0 +1,61 @@
+-- Normalize timeline_events characters/locations/tags into indexed join tables.
+-- The comma-joined columns stay as the source for hydrating models.
+
+CREATE TABLE IF NOT EXISTS timeline_event_characters (
+    event_id TEXT NOT NULL,
+    character_id TEXT NOT NULL,
+    PRIMARY KEY (event_id, character_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_timeline_event_characters_character
+    ON timeline_event_characters(character_id, event_id);
+
+CREATE TABLE IF NOT EXISTS timeline_event_locations (
+    event_id TEXT NOT NULL,
+    location_id TEXT NOT NULL,
+    PRIMARY KEY (event_id, location_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_timeline_event_locations_location
+    ON timeline_event_locations(location_id, event_id);
+
+CREATE TABLE IF NOT EXISTS timeline_event_tags (
+    event_id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (event_id, tag)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_timeline_event_tags_tag
+    ON timeline_event_tags(tag, event_id);
+
+CREATE TRIGGER IF NOT EXISTS timeline_events_links_ad AFTER DELETE ON timeline_events
+BEGIN
+    DELETE FROM timeline_event_characters WHERE event_id = OLD.id;
+    DELETE FROM timeline_event_locations WHERE event_id = OLD.id;
+    DELETE FROM timeline_event_tags WHERE event_id = OLD.id;
+END;
+
+-- Backfill from the existing CSV columns
+WITH RECURSIVE split(event_id, item, rest) AS (
+    SELECT id, '', characters || ',' FROM timeline_events WHERE characters != ''
+    UNION ALL
+    SELECT event_id, substr(rest, 1, instr(rest, ',') - 1), substr(rest, instr(rest, ',') + 1)
+    FROM split WHERE rest != ''
+)
+INSERT OR IGNORE INTO timeline_event_characters (event_id, character_id)
+SELECT event_id, item FROM split WHERE item != '';
+
+WITH RECURSIVE split(event_id, item, rest) AS (
+    SELECT id, '', locations || ',' FROM timeline_events WHERE locations != ''
+    UNION ALL
+    SELECT event_id, substr(rest, 1, instr(rest, ',') - 1), substr(rest, instr(rest, ',') + 1)
+    FROM split WHERE rest != ''
+)
+INSERT OR IGNORE INTO timeline_event_locations (event_id, location_id)
+SELECT event_id, item FROM split WHERE item != '';
+
+WITH RECURSIVE split(event_id, item, rest) AS (
+    SELECT id, '', tags || ',' FROM timeline_events WHERE tags != ''
+    UNION ALL
+    SELECT event_id, substr(rest, 1, instr(rest, ',') - 1), substr(rest, instr(rest, ',') + 1)
+    FROM split WHERE rest != ''
+)
+INSERT OR IGNORE INTO timeline_event_tags (event_id, tag)
+SELECT event_id, item FROM split WHERE item != '';
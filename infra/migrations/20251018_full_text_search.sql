@@ -0,0 +1,108 @@
+-- Full-text search indexes kept in sync with their tables by triggers
+
+-- Characters
+CREATE VIRTUAL TABLE IF NOT EXISTS characters_fts USING fts5(
+    name,
+    content='characters', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS characters_fts_ai AFTER INSERT ON characters BEGIN
+    INSERT INTO characters_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS characters_fts_ad AFTER DELETE ON characters BEGIN
+    INSERT INTO characters_fts(characters_fts, rowid, name)
+    VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS characters_fts_au AFTER UPDATE OF name ON characters BEGIN
+    INSERT INTO characters_fts(characters_fts, rowid, name)
+    VALUES ('delete', old.id, old.name);
+    INSERT INTO characters_fts(rowid, name) VALUES (new.id, new.name);
+END;
+INSERT INTO characters_fts(characters_fts) VALUES ('rebuild');
+
+-- Locations
+CREATE VIRTUAL TABLE IF NOT EXISTS locations_fts USING fts5(
+    name, region,
+    content='locations', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS locations_fts_ai AFTER INSERT ON locations BEGIN
+    INSERT INTO locations_fts(rowid, name, region)
+    VALUES (new.id, new.name, new.region);
+END;
+CREATE TRIGGER IF NOT EXISTS locations_fts_ad AFTER DELETE ON locations BEGIN
+    INSERT INTO locations_fts(locations_fts, rowid, name, region)
+    VALUES ('delete', old.id, old.name, old.region);
+END;
+CREATE TRIGGER IF NOT EXISTS locations_fts_au AFTER UPDATE OF name, region ON locations BEGIN
+    INSERT INTO locations_fts(locations_fts, rowid, name, region)
+    VALUES ('delete', old.id, old.name, old.region);
+    INSERT INTO locations_fts(rowid, name, region)
+    VALUES (new.id, new.name, new.region);
+END;
+INSERT INTO locations_fts(locations_fts) VALUES ('rebuild');
+
+-- Factions
+CREATE VIRTUAL TABLE IF NOT EXISTS factions_fts USING fts5(
+    name, description,
+    content='factions', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS factions_fts_ai AFTER INSERT ON factions BEGIN
+    INSERT INTO factions_fts(rowid, name, description)
+    VALUES (new.id, new.name, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS factions_fts_ad AFTER DELETE ON factions BEGIN
+    INSERT INTO factions_fts(factions_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS factions_fts_au AFTER UPDATE OF name, description ON factions BEGIN
+    INSERT INTO factions_fts(factions_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+    INSERT INTO factions_fts(rowid, name, description)
+    VALUES (new.id, new.name, new.description);
+END;
+INSERT INTO factions_fts(factions_fts) VALUES ('rebuild');
+
+-- Economy profiles
+CREATE VIRTUAL TABLE IF NOT EXISTS economy_profiles_fts USING fts5(
+    notes,
+    content='economy_profiles', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS economy_profiles_fts_ai AFTER INSERT ON economy_profiles BEGIN
+    INSERT INTO economy_profiles_fts(rowid, notes) VALUES (new.id, new.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS economy_profiles_fts_ad AFTER DELETE ON economy_profiles BEGIN
+    INSERT INTO economy_profiles_fts(economy_profiles_fts, rowid, notes)
+    VALUES ('delete', old.id, old.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS economy_profiles_fts_au AFTER UPDATE OF notes ON economy_profiles BEGIN
+    INSERT INTO economy_profiles_fts(economy_profiles_fts, rowid, notes)
+    VALUES ('delete', old.id, old.notes);
+    INSERT INTO economy_profiles_fts(rowid, notes) VALUES (new.id, new.notes);
+END;
+INSERT INTO economy_profiles_fts(economy_profiles_fts) VALUES ('rebuild');
+
+-- Timeline events have TEXT ids, so the index stores its own copy keyed by
+-- event_id instead of relying on the implicit rowid, which VACUUM may change.
+CREATE VIRTUAL TABLE IF NOT EXISTS timeline_events_fts USING fts5(
+    event_id UNINDEXED, title, description, tags,
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS timeline_events_fts_ai AFTER INSERT ON timeline_events BEGIN
+    INSERT INTO timeline_events_fts(event_id, title, description, tags)
+    VALUES (new.id, new.title, new.description, new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS timeline_events_fts_ad AFTER DELETE ON timeline_events BEGIN
+    DELETE FROM timeline_events_fts WHERE event_id = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS timeline_events_fts_au
+AFTER UPDATE OF id, title, description, tags ON timeline_events BEGIN
+    DELETE FROM timeline_events_fts WHERE event_id = old.id;
+    INSERT INTO timeline_events_fts(event_id, title, description, tags)
+    VALUES (new.id, new.title, new.description, new.tags);
+END;
+DELETE FROM timeline_events_fts;
+INSERT INTO timeline_events_fts(event_id, title, description, tags)
+SELECT id, title, description, tags FROM timeline_events;
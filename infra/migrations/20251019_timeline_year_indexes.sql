@@ -0,0 +1,9 @@
+-- Year-ordered timeline queries, optionally narrowed to a project and era
+
+CREATE INDEX IF NOT EXISTS idx_timeline_events_project_year
+    ON timeline_events(project_id, year, id);
+CREATE INDEX IF NOT EXISTS idx_timeline_events_project_era_year
+    ON timeline_events(project_id, era, year, id);
+-- Serves year ranges that are not scoped to a project.
+CREATE INDEX IF NOT EXISTS idx_timeline_events_year
+    ON timeline_events(year, id);
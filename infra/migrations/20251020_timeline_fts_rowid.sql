@@ -0,0 +1,48 @@
+-- Key the timeline search index by its own rowid
+
+-- Deleting by the UNINDEXED event_id column scanned the whole index on every
+-- update. timeline_events_fts_ids maps each event id to a stable FTS rowid,
+-- so the triggers reach index rows through the rowid instead.
+DROP TRIGGER IF EXISTS timeline_events_fts_ai;
+DROP TRIGGER IF EXISTS timeline_events_fts_ad;
+DROP TRIGGER IF EXISTS timeline_events_fts_au;
+DROP TABLE IF EXISTS timeline_events_fts;
+
+CREATE TABLE IF NOT EXISTS timeline_events_fts_ids (
+    fts_rowid INTEGER PRIMARY KEY,
+    event_id TEXT NOT NULL UNIQUE
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS timeline_events_fts USING fts5(
+    title, description, tags,
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS timeline_events_fts_ai AFTER INSERT ON timeline_events BEGIN
+    INSERT INTO timeline_events_fts_ids(event_id) VALUES (new.id);
+    INSERT INTO timeline_events_fts(rowid, title, description, tags)
+    VALUES (
+        (SELECT fts_rowid FROM timeline_events_fts_ids WHERE event_id = new.id),
+        new.title, new.description, new.tags
+    );
+END;
+CREATE TRIGGER IF NOT EXISTS timeline_events_fts_ad AFTER DELETE ON timeline_events BEGIN
+    DELETE FROM timeline_events_fts WHERE rowid =
+        (SELECT fts_rowid FROM timeline_events_fts_ids WHERE event_id = old.id);
+    DELETE FROM timeline_events_fts_ids WHERE event_id = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS timeline_events_fts_au
+AFTER UPDATE OF id, title, description, tags ON timeline_events BEGIN
+    UPDATE timeline_events_fts_ids SET event_id = new.id WHERE event_id = old.id;
+    DELETE FROM timeline_events_fts WHERE rowid =
+        (SELECT fts_rowid FROM timeline_events_fts_ids WHERE event_id = new.id);
+    INSERT INTO timeline_events_fts(rowid, title, description, tags)
+    VALUES (
+        (SELECT fts_rowid FROM timeline_events_fts_ids WHERE event_id = new.id),
+        new.title, new.description, new.tags
+    );
+END;
+
+DELETE FROM timeline_events_fts_ids;
+INSERT INTO timeline_events_fts_ids(event_id) SELECT id FROM timeline_events;
+INSERT INTO timeline_events_fts(rowid, title, description, tags)
+SELECT m.fts_rowid, e.title, e.description, e.tags
+FROM timeline_events AS e JOIN timeline_events_fts_ids AS m ON m.event_id = e.id;
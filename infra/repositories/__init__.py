@@ -1,16 +1,21 @@
 """Repository classes providing data access abstractions."""
 
+from ._common import Page, SearchHit
 from .character import CharacterRepository
 from .location import LocationRepository
 from .faction import FactionRepository
+from .identity_map import IdentityMap
 from .economy_profile import EconomyProfileRepository
 from .timeline_event import TimelineEventRepository
 from .world import WorldRepository
 
 __all__ = [
+    "Page",
+    "SearchHit",
     "CharacterRepository",
     "LocationRepository",
     "FactionRepository",
+    "IdentityMap",
     "EconomyProfileRepository",
     "TimelineEventRepository",
     "WorldRepository",
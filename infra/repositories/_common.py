@@ -0,0 +1,201 @@
+"""Helpers shared by the repository classes."""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    Sequence,
+    TypeVar,
+)
+
+from pydantic import TypeAdapter
+
+if TYPE_CHECKING:
+    from .identity_map import IdentityMap
+
+T = TypeVar("T")
+
+# Keep ``IN (...)`` lists below SQLite's historical 999 parameter limit.
+MAX_PARAMS = 900
+# Rows validated per TypeAdapter call when hydrating whole tables.
+HYDRATE_CHUNK = 1000
+
+
+def insert_many(
+    conn: sqlite3.Connection, sql: str, rows: Iterable[Sequence[object]]
+) -> list[int]:
+    """Run *sql* for every row with ``executemany`` and return the new rowids.
+
+    Rows inserted by one ``executemany`` inside a transaction receive
+    consecutive rowids, so they are derived from ``last_insert_rowid()``.
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+    conn.executemany(sql, rows)
+    last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last - len(rows) + 1, last + 1))
+
+
+def iter_models(
+    cur: sqlite3.Cursor,
+    chunk_size: int,
+    adapter: TypeAdapter[list[T]],
+    fields: Callable[[sqlite3.Row], dict[str, Any]],
+) -> Iterator[T]:
+    """Yield models from *cur*, validating *chunk_size* rows per *adapter* call.
+
+    One list validation per chunk skips entering pydantic through each
+    model's ``__init__``; bounded chunks keep large reads from holding every
+    intermediate dict at once.
+    """
+    while rows := cur.fetchmany(chunk_size):
+        yield from adapter.validate_python([fields(row) for row in rows])
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of a keyset-paginated listing.
+
+    ``next_after`` is the key to pass as ``after_id`` (or ``after``) for the
+    following page, or ``None`` when this was the last one.
+    """
+
+    items: list[T]
+    next_after: Any | None
+
+
+def page_query(
+    table: str,
+    columns: str,
+    after_id: Any | None,
+    limit: int,
+    project_id: str | None = None,
+    created_after: str | None = None,
+    created_before: str | None = None,
+) -> tuple[str, list[Any]]:
+    """Build a keyset-paginated ``SELECT`` ordered by ``id``."""
+    clauses: list[str] = []
+    params: list[Any] = []
+    if after_id is not None:
+        clauses.append("id > ?")
+        params.append(after_id)
+    if project_id is not None:
+        clauses.append("project_id = ?")
+        params.append(project_id)
+    if created_after is not None:
+        clauses.append("created_at >= ?")
+        params.append(created_after)
+    if created_before is not None:
+        clauses.append("created_at < ?")
+        params.append(created_before)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    params.append(limit)
+    return f"SELECT id, {columns} FROM {table}{where} ORDER BY id LIMIT ?", params
+
+
+def make_page(
+    rows: list[sqlite3.Row], limit: int, to_model: Callable[[sqlite3.Row], T]
+) -> Page[T]:
+    """Convert *rows* from :func:`page_query` into a :class:`Page`."""
+    next_after = rows[-1]["id"] if rows and len(rows) == limit else None
+    return Page([to_model(row) for row in rows], next_after)
+
+
+@dataclass
+class SearchHit(Generic[T]):
+    """One full-text search result.
+
+    ``score`` is the negated BM25 rank, so higher means more relevant, and
+    ``snippet`` is an excerpt of the best matching column with the matched
+    terms wrapped in ``[`` and ``]``.
+    """
+
+    item: T
+    score: float
+    snippet: str
+
+
+def fts_query(text: str) -> str:
+    """Turn free *text* into an FTS5 query matching every word as a prefix.
+
+    Words are quoted so punctuation typed by users is never parsed as FTS5
+    query syntax.
+    """
+    terms = (word.replace('"', '""') for word in text.split())
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_rows(
+    conn: sqlite3.Connection,
+    fts_table: str,
+    table: str,
+    columns: str,
+    query: str,
+    limit: int,
+    to_model: Callable[[sqlite3.Row], T],
+    key: str = "rowid",
+) -> list[SearchHit[T]]:
+    """Search *fts_table* and return the matching rows of *table*, best first.
+
+    *key* is an SQL expression over *fts_table* giving the id of the *table* row.
+    """
+    match = fts_query(query)
+    if not match:
+        return []
+    sql = (
+        f"WITH hits AS ("
+        f"SELECT {key} AS hit_id, bm25({fts_table}) AS hit_rank, "
+        f"snippet({fts_table}, -1, '[', ']', '…', 12) AS hit_snippet "
+        f"FROM {fts_table} WHERE {fts_table} MATCH ? ORDER BY hit_rank LIMIT ?) "
+        f"SELECT {columns}, hit_rank, hit_snippet FROM hits "
+        f"JOIN {table} ON {table}.id = hits.hit_id ORDER BY hit_rank"
+    )
+    return [
+        SearchHit(to_model(row), -row["hit_rank"], row["hit_snippet"])
+        for row in conn.execute(sql, (match, limit)).fetchall()
+    ]
+
+
+def load_many(
+    conn: sqlite3.Connection,
+    cache: IdentityMap | None,
+    table: str,
+    columns: str,
+    ids: Iterable[Hashable],
+    to_model: Callable[[sqlite3.Row], T],
+) -> dict[Any, T]:
+    """Load the rows of *table* with the given *ids*, keyed by id.
+
+    Cached entities are served from *cache*; the rest are fetched with
+    ``WHERE id IN (...)`` queries of at most :data:`MAX_PARAMS` ids and added
+    to the cache. Unknown ids are left out of the result.
+    """
+    found: dict[Any, T] = {}
+    missing: list[Hashable] = []
+    for entity_id in dict.fromkeys(ids):
+        cached = cache.get(table, entity_id) if cache is not None else None
+        if cached is None:
+            missing.append(entity_id)
+        else:
+            found[entity_id] = cached
+    for start in range(0, len(missing), MAX_PARAMS):
+        chunk = missing[start : start + MAX_PARAMS]
+        placeholders = ",".join("?" * len(chunk))
+        cur = conn.execute(
+            f"SELECT id, {columns} FROM {table} WHERE id IN ({placeholders})", chunk
+        )
+        for row in cur.fetchall():
+            model = to_model(row)
+            found[row["id"]] = model
+            if cache is not None:
+                cache.put(table, row["id"], model)
+    return found
@@ -1,46 +1,142 @@
 from __future__ import annotations
 
 import sqlite3
+from typing import Any, Iterable, Iterator, Mapping
+
+from pydantic import TypeAdapter
 
 from core import models
 
+from ._common import (
+    HYDRATE_CHUNK,
+    Page,
+    SearchHit,
+    insert_many,
+    iter_models,
+    load_many,
+    make_page,
+    page_query,
+    search_rows,
+)
+from .identity_map import IdentityMap
+
+_CHARACTER_LIST = TypeAdapter(list[models.Character])
+_COLUMNS = "name, birth_year, location, faction"
+
+
+def _fields(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "name": row["name"],
+        "birth_year": row["birth_year"],
+        "location": row["location"],
+        "faction": row["faction"],
+    }
+
+
+def _to_model(row: sqlite3.Row) -> models.Character:
+    return models.Character(**_fields(row))
+
 
 class CharacterRepository:
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(self, conn: sqlite3.Connection, cache: IdentityMap | None = None):
         self.conn = conn
+        self.cache = cache
+
+    def _invalidate(self, ids: Iterable[Any]) -> None:
+        if self.cache is not None:
+            for entity_id in ids:
+                self.cache.invalidate("characters", entity_id)
 
     def create(self, character: models.Character) -> int:
         cur = self.conn.execute(
             "INSERT INTO characters (name, birth_year, location, faction) VALUES (?, ?, ?, ?)",
             (character.name, character.birth_year, character.location, character.faction),
         )
+        self._invalidate([cur.lastrowid])
         return cur.lastrowid
 
+    def create_many(
+        self, characters: Iterable[models.Character | dict[str, Any]]
+    ) -> list[int]:
+        items = _CHARACTER_LIST.validate_python(list(characters))
+        ids = insert_many(
+            self.conn,
+            "INSERT INTO characters (name, birth_year, location, faction) VALUES (?, ?, ?, ?)",
+            [(c.name, c.birth_year, c.location, c.faction) for c in items],
+        )
+        self._invalidate(ids)
+        return ids
+
+    def update_many(
+        self, changes: Mapping[int, models.Character | dict[str, Any]]
+    ) -> None:
+        items = _CHARACTER_LIST.validate_python(list(changes.values()))
+        self.conn.executemany(
+            "UPDATE characters SET name = ?, birth_year = ?, location = ?, faction = ? "
+            "WHERE id = ?",
+            [
+                (c.name, c.birth_year, c.location, c.faction, entity_id)
+                for entity_id, c in zip(changes, items)
+            ],
+        )
+        self._invalidate(changes)
+
     def find(self, character_id: int) -> models.Character | None:
+        if self.cache is not None:
+            cached = self.cache.get("characters", character_id)
+            if cached is not None:
+                return cached
         cur = self.conn.execute(
-            "SELECT name, birth_year, location, faction FROM characters WHERE id = ?",
+            f"SELECT {_COLUMNS} FROM characters WHERE id = ?",
             (character_id,),
         )
         row = cur.fetchone()
         if row:
-            return models.Character(
-                name=row["name"],
-                birth_year=row["birth_year"],
-                location=row["location"],
-                faction=row["faction"],
-            )
+            model = _to_model(row)
+            if self.cache is not None:
+                self.cache.put("characters", character_id, model)
+            return model
         return None
 
+    def find_many(self, ids: Iterable[int]) -> dict[int, models.Character]:
+        return load_many(self.conn, self.cache, "characters", _COLUMNS, ids, _to_model)
+
     def list(self) -> list[models.Character]:
-        cur = self.conn.execute(
-            "SELECT name, birth_year, location, faction FROM characters"
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM characters")
+        return list(iter_models(cur, HYDRATE_CHUNK, _CHARACTER_LIST, _fields))
+
+    def iter(self, chunk_size: int = 500) -> Iterator[models.Character]:
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM characters")
+        yield from iter_models(cur, chunk_size, _CHARACTER_LIST, _fields)
+
+    def page(
+        self,
+        after_id: int | None = None,
+        limit: int = 100,
+        *,
+        project_id: str | None = None,
+        created_after: str | None = None,
+        created_before: str | None = None,
+    ) -> Page[models.Character]:
+        sql, params = page_query(
+            "characters",
+            _COLUMNS,
+            after_id,
+            limit,
+            project_id,
+            created_after,
+            created_before,
+        )
+        rows = self.conn.execute(sql, params).fetchall()
+        return make_page(rows, limit, _to_model)
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit[models.Character]]:
+        return search_rows(
+            self.conn,
+            "characters_fts",
+            "characters",
+            _COLUMNS,
+            query,
+            limit,
+            _to_model,
         )
-        return [
-            models.Character(
-                name=row["name"],
-                birth_year=row["birth_year"],
-                location=row["location"],
-                faction=row["faction"],
-            )
-            for row in cur.fetchall()
-        ]
@@ -1,36 +1,144 @@
 from __future__ import annotations
 
 import sqlite3
+from typing import Any, Iterable, Iterator, Mapping
+
+from pydantic import TypeAdapter
 
 from core import models
 
+from ._common import (
+    HYDRATE_CHUNK,
+    Page,
+    SearchHit,
+    insert_many,
+    iter_models,
+    load_many,
+    make_page,
+    page_query,
+    search_rows,
+)
+from .identity_map import IdentityMap
+
+_PROFILE_LIST = TypeAdapter(list[models.EconomyProfile])
+_COLUMNS = "name, gdp, notes"
+
+
+def _fields(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "name": row["name"],
+        "gdp": row["gdp"],
+        "notes": row["notes"],
+    }
+
+
+def _to_model(row: sqlite3.Row) -> models.EconomyProfile:
+    return models.EconomyProfile(**_fields(row))
+
 
 class EconomyProfileRepository:
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(self, conn: sqlite3.Connection, cache: IdentityMap | None = None):
         self.conn = conn
+        self.cache = cache
+
+    def _invalidate(self, ids: Iterable[Any]) -> None:
+        if self.cache is not None:
+            for entity_id in ids:
+                self.cache.invalidate("economy_profiles", entity_id)
 
     def create(self, profile: models.EconomyProfile) -> int:
         cur = self.conn.execute(
             "INSERT INTO economy_profiles (name, gdp, notes) VALUES (?, ?, ?)",
             (profile.name, profile.gdp, profile.notes),
         )
+        self._invalidate([cur.lastrowid])
         return cur.lastrowid
 
+    def create_many(
+        self, profiles: Iterable[models.EconomyProfile | dict[str, Any]]
+    ) -> list[int]:
+        items = _PROFILE_LIST.validate_python(list(profiles))
+        ids = insert_many(
+            self.conn,
+            "INSERT INTO economy_profiles (name, gdp, notes) VALUES (?, ?, ?)",
+            [(p.name, p.gdp, p.notes) for p in items],
+        )
+        self._invalidate(ids)
+        return ids
+
+    def update_many(
+        self, changes: Mapping[int, models.EconomyProfile | dict[str, Any]]
+    ) -> None:
+        items = _PROFILE_LIST.validate_python(list(changes.values()))
+        self.conn.executemany(
+            "UPDATE economy_profiles SET name = ?, gdp = ?, notes = ? WHERE id = ?",
+            [
+                (p.name, p.gdp, p.notes, entity_id)
+                for entity_id, p in zip(changes, items)
+            ],
+        )
+        self._invalidate(changes)
+
     def find(self, profile_id: int) -> models.EconomyProfile | None:
+        if self.cache is not None:
+            cached = self.cache.get("economy_profiles", profile_id)
+            if cached is not None:
+                return cached
         cur = self.conn.execute(
-            "SELECT name, gdp, notes FROM economy_profiles WHERE id = ?",
+            f"SELECT {_COLUMNS} FROM economy_profiles WHERE id = ?",
             (profile_id,),
         )
         row = cur.fetchone()
         if row:
-            return models.EconomyProfile(
-                name=row["name"], gdp=row["gdp"], notes=row["notes"]
-            )
+            model = _to_model(row)
+            if self.cache is not None:
+                self.cache.put("economy_profiles", profile_id, model)
+            return model
         return None
 
+    def find_many(self, ids: Iterable[int]) -> dict[int, models.EconomyProfile]:
+        return load_many(
+            self.conn, self.cache, "economy_profiles", _COLUMNS, ids, _to_model
+        )
+
     def list(self) -> list[models.EconomyProfile]:
-        cur = self.conn.execute("SELECT name, gdp, notes FROM economy_profiles")
-        return [
-            models.EconomyProfile(name=row["name"], gdp=row["gdp"], notes=row["notes"])
-            for row in cur.fetchall()
-        ]
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM economy_profiles")
+        return list(iter_models(cur, HYDRATE_CHUNK, _PROFILE_LIST, _fields))
+
+    def iter(self, chunk_size: int = 500) -> Iterator[models.EconomyProfile]:
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM economy_profiles")
+        yield from iter_models(cur, chunk_size, _PROFILE_LIST, _fields)
+
+    def page(
+        self,
+        after_id: int | None = None,
+        limit: int = 100,
+        *,
+        project_id: str | None = None,
+        created_after: str | None = None,
+        created_before: str | None = None,
+    ) -> Page[models.EconomyProfile]:
+        sql, params = page_query(
+            "economy_profiles",
+            _COLUMNS,
+            after_id,
+            limit,
+            project_id,
+            created_after,
+            created_before,
+        )
+        rows = self.conn.execute(sql, params).fetchall()
+        return make_page(rows, limit, _to_model)
+
+    def search(
+        self, query: str, limit: int = 20
+    ) -> list[SearchHit[models.EconomyProfile]]:
+        return search_rows(
+            self.conn,
+            "economy_profiles_fts",
+            "economy_profiles",
+            _COLUMNS,
+            query,
+            limit,
+            _to_model,
+        )
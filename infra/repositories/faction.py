@@ -1,34 +1,137 @@
 from __future__ import annotations
 
 import sqlite3
+from typing import Any, Iterable, Iterator, Mapping
+
+from pydantic import TypeAdapter
 
 from core import models
 
+from ._common import (
+    HYDRATE_CHUNK,
+    Page,
+    SearchHit,
+    insert_many,
+    iter_models,
+    load_many,
+    make_page,
+    page_query,
+    search_rows,
+)
+from .identity_map import IdentityMap
+
+_FACTION_LIST = TypeAdapter(list[models.Faction])
+_COLUMNS = "name, description"
+
+
+# ``models.Faction`` has no ``description`` field; the column stores ``summary``.
+def _fields(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "name": row["name"],
+        "summary": row["description"],
+    }
+
+
+def _to_model(row: sqlite3.Row) -> models.Faction:
+    return models.Faction(**_fields(row))
+
 
 class FactionRepository:
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(self, conn: sqlite3.Connection, cache: IdentityMap | None = None):
         self.conn = conn
+        self.cache = cache
+
+    def _invalidate(self, ids: Iterable[Any]) -> None:
+        if self.cache is not None:
+            for entity_id in ids:
+                self.cache.invalidate("factions", entity_id)
 
     def create(self, faction: models.Faction) -> int:
         cur = self.conn.execute(
             "INSERT INTO factions (name, description) VALUES (?, ?)",
-            (faction.name, faction.description),
+            (faction.name, faction.summary),
         )
+        self._invalidate([cur.lastrowid])
         return cur.lastrowid
 
+    def create_many(
+        self, factions: Iterable[models.Faction | dict[str, Any]]
+    ) -> list[int]:
+        items = _FACTION_LIST.validate_python(list(factions))
+        ids = insert_many(
+            self.conn,
+            "INSERT INTO factions (name, description) VALUES (?, ?)",
+            [(f.name, f.summary) for f in items],
+        )
+        self._invalidate(ids)
+        return ids
+
+    def update_many(
+        self, changes: Mapping[int, models.Faction | dict[str, Any]]
+    ) -> None:
+        items = _FACTION_LIST.validate_python(list(changes.values()))
+        self.conn.executemany(
+            "UPDATE factions SET name = ?, description = ? WHERE id = ?",
+            [(f.name, f.summary, entity_id) for entity_id, f in zip(changes, items)],
+        )
+        self._invalidate(changes)
+
     def find(self, faction_id: int) -> models.Faction | None:
+        if self.cache is not None:
+            cached = self.cache.get("factions", faction_id)
+            if cached is not None:
+                return cached
         cur = self.conn.execute(
-            "SELECT name, description FROM factions WHERE id = ?",
+            f"SELECT {_COLUMNS} FROM factions WHERE id = ?",
             (faction_id,),
         )
         row = cur.fetchone()
         if row:
-            return models.Faction(name=row["name"], description=row["description"])
+            model = _to_model(row)
+            if self.cache is not None:
+                self.cache.put("factions", faction_id, model)
+            return model
         return None
 
+    def find_many(self, ids: Iterable[int]) -> dict[int, models.Faction]:
+        return load_many(self.conn, self.cache, "factions", _COLUMNS, ids, _to_model)
+
     def list(self) -> list[models.Faction]:
-        cur = self.conn.execute("SELECT name, description FROM factions")
-        return [
-            models.Faction(name=row["name"], description=row["description"])
-            for row in cur.fetchall()
-        ]
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM factions")
+        return list(iter_models(cur, HYDRATE_CHUNK, _FACTION_LIST, _fields))
+
+    def iter(self, chunk_size: int = 500) -> Iterator[models.Faction]:
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM factions")
+        yield from iter_models(cur, chunk_size, _FACTION_LIST, _fields)
+
+    def page(
+        self,
+        after_id: int | None = None,
+        limit: int = 100,
+        *,
+        project_id: str | None = None,
+        created_after: str | None = None,
+        created_before: str | None = None,
+    ) -> Page[models.Faction]:
+        sql, params = page_query(
+            "factions",
+            _COLUMNS,
+            after_id,
+            limit,
+            project_id,
+            created_after,
+            created_before,
+        )
+        rows = self.conn.execute(sql, params).fetchall()
+        return make_page(rows, limit, _to_model)
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit[models.Faction]]:
+        return search_rows(
+            self.conn,
+            "factions_fts",
+            "factions",
+            _COLUMNS,
+            query,
+            limit,
+            _to_model,
+        )
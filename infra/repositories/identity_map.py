@@ -0,0 +1,100 @@
+"""Identity map shared by repositories to avoid repeated lookups."""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable
+
+_maps: weakref.WeakSet[IdentityMap] = weakref.WeakSet()
+
+
+class IdentityMap:
+    """Bounded LRU cache of loaded entities keyed by ``(table, id)``.
+
+    Pass one instance to several repositories to share it across a session.
+    Repositories read through it in ``find`` and invalidate entries on writes.
+    Entries cached by a thread are journaled until :func:`commit_pending`
+    keeps them or :func:`discard_pending` drops them, so models read inside
+    a transaction that is rolled back do not outlive it.
+    """
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[tuple[str, Hashable], Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        _maps.add(self)
+
+    def _pending(self) -> set[tuple[str, Hashable]]:
+        pending = getattr(self._local, "keys", None)
+        if pending is None:
+            pending = self._local.keys = set()
+        return pending
+
+    def get(self, table: str, entity_id: Hashable) -> Any | None:
+        """Return the cached entity or ``None``, updating the counters."""
+        key = (table, entity_id)
+        with self._lock:
+            entity = self._data.get(key)
+            if entity is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entity
+
+    def put(self, table: str, entity_id: Hashable, entity: Any) -> None:
+        """Cache *entity*, evicting the least recently used entries."""
+        key = (table, entity_id)
+        with self._lock:
+            self._data[key] = entity
+            self._data.move_to_end(key)
+            self._pending().add(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, table: str, entity_id: Hashable | None = None) -> None:
+        """Drop one entity, or every entity of *table* when no id is given."""
+        with self._lock:
+            if entity_id is not None:
+                self._data.pop((table, entity_id), None)
+                return
+            for key in [k for k in self._data if k[0] == table]:
+                del self._data[key]
+
+    def commit(self) -> None:
+        """Keep the entries cached by the current thread since its last commit."""
+        self._pending().clear()
+
+    def rollback(self) -> None:
+        """Drop the entries cached by the current thread since its last commit."""
+        pending = self._pending()
+        with self._lock:
+            for key in pending:
+                self._data.pop(key, None)
+        pending.clear()
+
+    def clear(self) -> None:
+        """Drop every cached entity and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def commit_pending() -> None:
+    """Call :meth:`IdentityMap.commit` on every live identity map."""
+    for identity_map in list(_maps):
+        identity_map.commit()
+
+
+def discard_pending() -> None:
+    """Call :meth:`IdentityMap.rollback` on every live identity map."""
+    for identity_map in list(_maps):
+        identity_map.rollback()
@@ -1,44 +1,140 @@
 from __future__ import annotations
 
 import sqlite3
+from typing import Any, Iterable, Iterator, Mapping
+
+from pydantic import TypeAdapter
 
 from core import models
 
+from ._common import (
+    HYDRATE_CHUNK,
+    Page,
+    SearchHit,
+    insert_many,
+    iter_models,
+    load_many,
+    make_page,
+    page_query,
+    search_rows,
+)
+from .identity_map import IdentityMap
+
+_LOCATION_LIST = TypeAdapter(list[models.Location])
+_COLUMNS = "name, population, region"
+
+
+def _fields(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "name": row["name"],
+        "population": row["population"],
+        "region": row["region"],
+    }
+
+
+def _to_model(row: sqlite3.Row) -> models.Location:
+    return models.Location(**_fields(row))
+
 
 class LocationRepository:
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(self, conn: sqlite3.Connection, cache: IdentityMap | None = None):
         self.conn = conn
+        self.cache = cache
+
+    def _invalidate(self, ids: Iterable[Any]) -> None:
+        if self.cache is not None:
+            for entity_id in ids:
+                self.cache.invalidate("locations", entity_id)
 
     def create(self, location: models.Location) -> int:
         cur = self.conn.execute(
             "INSERT INTO locations (name, population, region) VALUES (?, ?, ?)",
             (location.name, location.population, location.region),
         )
+        self._invalidate([cur.lastrowid])
         return cur.lastrowid
 
+    def create_many(
+        self, locations: Iterable[models.Location | dict[str, Any]]
+    ) -> list[int]:
+        items = _LOCATION_LIST.validate_python(list(locations))
+        ids = insert_many(
+            self.conn,
+            "INSERT INTO locations (name, population, region) VALUES (?, ?, ?)",
+            [(loc.name, loc.population, loc.region) for loc in items],
+        )
+        self._invalidate(ids)
+        return ids
+
+    def update_many(
+        self, changes: Mapping[int, models.Location | dict[str, Any]]
+    ) -> None:
+        items = _LOCATION_LIST.validate_python(list(changes.values()))
+        self.conn.executemany(
+            "UPDATE locations SET name = ?, population = ?, region = ? WHERE id = ?",
+            [
+                (loc.name, loc.population, loc.region, entity_id)
+                for entity_id, loc in zip(changes, items)
+            ],
+        )
+        self._invalidate(changes)
+
     def find(self, location_id: int) -> models.Location | None:
+        if self.cache is not None:
+            cached = self.cache.get("locations", location_id)
+            if cached is not None:
+                return cached
         cur = self.conn.execute(
-            "SELECT name, population, region FROM locations WHERE id = ?",
+            f"SELECT {_COLUMNS} FROM locations WHERE id = ?",
             (location_id,),
         )
         row = cur.fetchone()
         if row:
-            return models.Location(
-                name=row["name"],
-                population=row["population"],
-                region=row["region"],
-            )
+            model = _to_model(row)
+            if self.cache is not None:
+                self.cache.put("locations", location_id, model)
+            return model
         return None
 
+    def find_many(self, ids: Iterable[int]) -> dict[int, models.Location]:
+        return load_many(self.conn, self.cache, "locations", _COLUMNS, ids, _to_model)
+
     def list(self) -> list[models.Location]:
-        cur = self.conn.execute(
-            "SELECT name, population, region FROM locations"
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM locations")
+        return list(iter_models(cur, HYDRATE_CHUNK, _LOCATION_LIST, _fields))
+
+    def iter(self, chunk_size: int = 500) -> Iterator[models.Location]:
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM locations")
+        yield from iter_models(cur, chunk_size, _LOCATION_LIST, _fields)
+
+    def page(
+        self,
+        after_id: int | None = None,
+        limit: int = 100,
+        *,
+        project_id: str | None = None,
+        created_after: str | None = None,
+        created_before: str | None = None,
+    ) -> Page[models.Location]:
+        sql, params = page_query(
+            "locations",
+            _COLUMNS,
+            after_id,
+            limit,
+            project_id,
+            created_after,
+            created_before,
+        )
+        rows = self.conn.execute(sql, params).fetchall()
+        return make_page(rows, limit, _to_model)
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit[models.Location]]:
+        return search_rows(
+            self.conn,
+            "locations_fts",
+            "locations",
+            _COLUMNS,
+            query,
+            limit,
+            _to_model,
         )
-        return [
-            models.Location(
-                name=row["name"],
-                population=row["population"],
-                region=row["region"],
-            )
-            for row in cur.fetchall()
-        ]
@@ -1,13 +1,91 @@
 from __future__ import annotations
 
 import sqlite3
+from typing import Any, Iterable, Iterator, Mapping
+
+from pydantic import TypeAdapter
 
 from core import models
 
+from ._common import (
+    HYDRATE_CHUNK,
+    Page,
+    SearchHit,
+    insert_many,
+    iter_models,
+    load_many,
+    make_page,
+    page_query,
+    search_rows,
+)
+from .identity_map import IdentityMap
+
+_EVENT_LIST = TypeAdapter(list[models.TimelineEvent])
+_DATA_COLUMNS = "title, year, era, scope, description, characters, locations, tags"
+_COLUMNS = f"id, {_DATA_COLUMNS}"
+_LINK_TABLES = (
+    "timeline_event_characters",
+    "timeline_event_locations",
+    "timeline_event_tags",
+)
+# Index rows are addressed by rowid; timeline_events_fts_ids maps them back.
+_FTS_KEY = (
+    "(SELECT event_id FROM timeline_events_fts_ids "
+    "WHERE fts_rowid = timeline_events_fts.rowid)"
+)
+
+
+def _fields(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "year": row["year"],
+        "era": row["era"],
+        "scope": row["scope"],
+        "description": row["description"],
+        "character_ids": [c for c in row["characters"].split(",") if c],
+        "location_ids": [l for l in row["locations"].split(",") if l],
+        "tags": [t for t in row["tags"].split(",") if t],
+    }
+
+
+def _to_model(row: sqlite3.Row) -> models.TimelineEvent:
+    return models.TimelineEvent(**_fields(row))
+
+
+def _write_links(
+    conn: sqlite3.Connection, events: Iterable[models.TimelineEvent]
+) -> None:
+    characters: list[tuple[str, str]] = []
+    locations: list[tuple[str, str]] = []
+    tags: list[tuple[str, str]] = []
+    for e in events:
+        characters.extend((e.id, c) for c in e.character_ids if c)
+        locations.extend((e.id, l) for l in e.location_ids if l)
+        tags.extend((e.id, t) for t in e.tags if t)
+    conn.executemany(
+        "INSERT OR IGNORE INTO timeline_event_characters (event_id, character_id) VALUES (?, ?)",
+        characters,
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO timeline_event_locations (event_id, location_id) VALUES (?, ?)",
+        locations,
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO timeline_event_tags (event_id, tag) VALUES (?, ?)",
+        tags,
+    )
+
 
 class TimelineEventRepository:
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(self, conn: sqlite3.Connection, cache: IdentityMap | None = None):
         self.conn = conn
+        self.cache = cache
+
+    def _invalidate(self, ids: Iterable[Any]) -> None:
+        if self.cache is not None:
+            for entity_id in ids:
+                self.cache.invalidate("timeline_events", entity_id)
 
     def create(self, event: models.TimelineEvent) -> int:
         cur = self.conn.execute(
@@ -27,46 +105,200 @@ class TimelineEventRepository:
                 ",".join(event.tags),
             ),
         )
+        _write_links(self.conn, [event])
+        self._invalidate([event.id])
         return cur.lastrowid
 
-    def find(self, event_id: str) -> models.TimelineEvent | None:
-        cur = self.conn.execute(
+    def create_many(
+        self, events: Iterable[models.TimelineEvent | dict[str, Any]]
+    ) -> list[str]:
+        items = _EVENT_LIST.validate_python(list(events))
+        insert_many(
+            self.conn,
+            (
+                "INSERT INTO timeline_events (id, title, year, era, scope, description, characters, locations, tags) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            ),
+            [
+                (
+                    e.id,
+                    e.title,
+                    e.year,
+                    e.era,
+                    e.scope,
+                    e.description,
+                    ",".join(e.character_ids),
+                    ",".join(e.location_ids),
+                    ",".join(e.tags),
+                )
+                for e in items
+            ],
+        )
+        _write_links(self.conn, items)
+        self._invalidate(e.id for e in items)
+        return [e.id for e in items]
+
+    def update_many(
+        self, changes: Mapping[str, models.TimelineEvent | dict[str, Any]]
+    ) -> None:
+        items = _EVENT_LIST.validate_python(list(changes.values()))
+        self.conn.executemany(
             (
-                "SELECT id, title, year, era, scope, description, characters, locations, tags "
-                "FROM timeline_events WHERE id = ?"
+                "UPDATE timeline_events SET id = ?, title = ?, year = ?, era = ?, "
+                "scope = ?, description = ?, characters = ?, locations = ?, tags = ? "
+                "WHERE id = ?"
             ),
+            [
+                (
+                    e.id,
+                    e.title,
+                    e.year,
+                    e.era,
+                    e.scope,
+                    e.description,
+                    ",".join(e.character_ids),
+                    ",".join(e.location_ids),
+                    ",".join(e.tags),
+                    event_id,
+                )
+                for event_id, e in zip(changes, items)
+            ],
+        )
+        old_ids = [(event_id,) for event_id in changes]
+        for table in _LINK_TABLES:
+            self.conn.executemany(f"DELETE FROM {table} WHERE event_id = ?", old_ids)
+        _write_links(self.conn, items)
+        self._invalidate([*changes, *(e.id for e in items)])
+
+    def find(self, event_id: str) -> models.TimelineEvent | None:
+        if self.cache is not None:
+            cached = self.cache.get("timeline_events", event_id)
+            if cached is not None:
+                return cached
+        cur = self.conn.execute(
+            f"SELECT {_COLUMNS} FROM timeline_events WHERE id = ?",
             (event_id,),
         )
         row = cur.fetchone()
         if row:
-            return models.TimelineEvent(
-                id=row["id"],
-                title=row["title"],
-                year=row["year"],
-                era=row["era"],
-                scope=row["scope"],
-                description=row["description"],
-                character_ids=[c for c in row["characters"].split(",") if c],
-                location_ids=[l for l in row["locations"].split(",") if l],
-                tags=[t for t in row["tags"].split(",") if t],
-            )
+            model = _to_model(row)
+            if self.cache is not None:
+                self.cache.put("timeline_events", event_id, model)
+            return model
         return None
 
+    def find_many(self, ids: Iterable[str]) -> dict[str, models.TimelineEvent]:
+        return load_many(
+            self.conn,
+            self.cache,
+            "timeline_events",
+            _DATA_COLUMNS,
+            ids,
+            _to_model,
+        )
+
     def list(self) -> list[models.TimelineEvent]:
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM timeline_events")
+        return list(iter_models(cur, HYDRATE_CHUNK, _EVENT_LIST, _fields))
+
+    def iter(self, chunk_size: int = 500) -> Iterator[models.TimelineEvent]:
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM timeline_events")
+        yield from iter_models(cur, chunk_size, _EVENT_LIST, _fields)
+
+    def page(
+        self,
+        after_id: str | None = None,
+        limit: int = 100,
+        *,
+        project_id: str | None = None,
+        created_after: str | None = None,
+        created_before: str | None = None,
+    ) -> Page[models.TimelineEvent]:
+        sql, params = page_query(
+            "timeline_events",
+            _DATA_COLUMNS,
+            after_id,
+            limit,
+            project_id,
+            created_after,
+            created_before,
+        )
+        rows = self.conn.execute(sql, params).fetchall()
+        return make_page(rows, limit, _to_model)
+
+    def between(
+        self,
+        year_from: int,
+        year_to: int,
+        era: str | None = None,
+        scope: str | None = None,
+        *,
+        after: tuple[int, str] | None = None,
+        limit: int = 100,
+        project_id: str | None = None,
+    ) -> Page[models.TimelineEvent]:
+        """Return events with ``year_from <= year <= year_to`` in year order.
+
+        Pages are keyed by ``(year, id)``; pass ``next_after`` of a page as
+        *after* to fetch the following one.
+        """
+        if after is not None:
+            # Start the index range at the cursor, not at year_from.
+            year_from = max(year_from, after[0])
+        clauses = ["year BETWEEN ? AND ?"]
+        params: list[Any] = [year_from, year_to]
+        if project_id is not None:
+            clauses.append("project_id = ?")
+            params.append(project_id)
+        if era is not None:
+            clauses.append("era = ?")
+            params.append(era)
+        if scope is not None:
+            clauses.append("scope = ?")
+            params.append(scope)
+        if after is not None:
+            clauses.append("(year, id) > (?, ?)")
+            params.extend(after)
+        params.append(limit)
+        rows = self.conn.execute(
+            f"SELECT {_COLUMNS} FROM timeline_events WHERE {' AND '.join(clauses)} "
+            "ORDER BY year, id LIMIT ?",
+            params,
+        ).fetchall()
+        next_after = (
+            (rows[-1]["year"], rows[-1]["id"]) if rows and len(rows) == limit else None
+        )
+        return Page([_to_model(row) for row in rows], next_after)
+
+    def search(
+        self, query: str, limit: int = 20
+    ) -> list[SearchHit[models.TimelineEvent]]:
+        return search_rows(
+            self.conn,
+            "timeline_events_fts",
+            "timeline_events",
+            _COLUMNS,
+            query,
+            limit,
+            _to_model,
+            key=_FTS_KEY,
+        )
+
+    def _linked(
+        self, table: str, column: str, value: str
+    ) -> list[models.TimelineEvent]:
         cur = self.conn.execute(
-            "SELECT id, title, year, era, scope, description, characters, locations, tags FROM timeline_events"
+            f"SELECT {_COLUMNS} FROM timeline_events WHERE id IN "
+            f"(SELECT event_id FROM {table} WHERE {column} = ?) ORDER BY year, id",
+            (value,),
         )
-        return [
-            models.TimelineEvent(
-                id=row["id"],
-                title=row["title"],
-                year=row["year"],
-                era=row["era"],
-                scope=row["scope"],
-                description=row["description"],
-                character_ids=[c for c in row["characters"].split(",") if c],
-                location_ids=[l for l in row["locations"].split(",") if l],
-                tags=[t for t in row["tags"].split(",") if t],
-            )
-            for row in cur.fetchall()
-        ]
+        return [_to_model(row) for row in cur.fetchall()]
+
+    def events_for_character(self, character_id: str) -> list[models.TimelineEvent]:
+        return self._linked("timeline_event_characters", "character_id", character_id)
+
+    def events_at_location(self, location_id: str) -> list[models.TimelineEvent]:
+        return self._linked("timeline_event_locations", "location_id", location_id)
+
+    def events_with_tag(self, tag: str) -> list[models.TimelineEvent]:
+        return self._linked("timeline_event_tags", "tag", tag)
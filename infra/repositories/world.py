@@ -1,34 +1,122 @@
 from __future__ import annotations
 
 import sqlite3
+from typing import Any, Iterable, Iterator, Mapping
+
+from pydantic import TypeAdapter
 
 from core import models
 
+from ._common import (
+    HYDRATE_CHUNK,
+    Page,
+    insert_many,
+    iter_models,
+    load_many,
+    make_page,
+    page_query,
+)
+from .identity_map import IdentityMap
+
+_WORLD_LIST = TypeAdapter(list[models.World])
+_COLUMNS = "name, description"
+
+
+def _fields(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "name": row["name"],
+        "description": row["description"],
+    }
+
+
+def _to_model(row: sqlite3.Row) -> models.World:
+    return models.World(**_fields(row))
+
 
 class WorldRepository:
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(self, conn: sqlite3.Connection, cache: IdentityMap | None = None):
         self.conn = conn
+        self.cache = cache
+
+    def _invalidate(self, ids: Iterable[Any]) -> None:
+        if self.cache is not None:
+            for entity_id in ids:
+                self.cache.invalidate("worlds", entity_id)
 
     def create(self, world: models.World) -> int:
         cur = self.conn.execute(
             "INSERT INTO worlds (name, description) VALUES (?, ?)",
             (world.name, world.description),
         )
+        self._invalidate([cur.lastrowid])
         return cur.lastrowid
 
+    def create_many(self, worlds: Iterable[models.World | dict[str, Any]]) -> list[int]:
+        items = _WORLD_LIST.validate_python(list(worlds))
+        ids = insert_many(
+            self.conn,
+            "INSERT INTO worlds (name, description) VALUES (?, ?)",
+            [(w.name, w.description) for w in items],
+        )
+        self._invalidate(ids)
+        return ids
+
+    def update_many(self, changes: Mapping[int, models.World | dict[str, Any]]) -> None:
+        items = _WORLD_LIST.validate_python(list(changes.values()))
+        self.conn.executemany(
+            "UPDATE worlds SET name = ?, description = ? WHERE id = ?",
+            [
+                (w.name, w.description, entity_id)
+                for entity_id, w in zip(changes, items)
+            ],
+        )
+        self._invalidate(changes)
+
     def find(self, world_id: int) -> models.World | None:
+        if self.cache is not None:
+            cached = self.cache.get("worlds", world_id)
+            if cached is not None:
+                return cached
         cur = self.conn.execute(
-            "SELECT name, description FROM worlds WHERE id = ?",
+            f"SELECT {_COLUMNS} FROM worlds WHERE id = ?",
             (world_id,),
         )
         row = cur.fetchone()
         if row:
-            return models.World(name=row["name"], description=row["description"])
+            model = _to_model(row)
+            if self.cache is not None:
+                self.cache.put("worlds", world_id, model)
+            return model
         return None
 
+    def find_many(self, ids: Iterable[int]) -> dict[int, models.World]:
+        return load_many(self.conn, self.cache, "worlds", _COLUMNS, ids, _to_model)
+
     def list(self) -> list[models.World]:
-        cur = self.conn.execute("SELECT name, description FROM worlds")
-        return [
-            models.World(name=row["name"], description=row["description"])
-            for row in cur.fetchall()
-        ]
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM worlds")
+        return list(iter_models(cur, HYDRATE_CHUNK, _WORLD_LIST, _fields))
+
+    def iter(self, chunk_size: int = 500) -> Iterator[models.World]:
+        cur = self.conn.execute(f"SELECT {_COLUMNS} FROM worlds")
+        yield from iter_models(cur, chunk_size, _WORLD_LIST, _fields)
+
+    def page(
+        self,
+        after_id: int | None = None,
+        limit: int = 100,
+        *,
+        project_id: str | None = None,
+        created_after: str | None = None,
+        created_before: str | None = None,
+    ) -> Page[models.World]:
+        sql, params = page_query(
+            "worlds",
+            _COLUMNS,
+            after_id,
+            limit,
+            project_id,
+            created_after,
+            created_before,
+        )
+        rows = self.conn.execute(sql, params).fetchall()
+        return make_page(rows, limit, _to_model)
@@ -0,0 +1,95 @@
+"""Per-thread SQLite connections with nested transactions.
+
+Shared by :mod:`infra.db` and :mod:`data.db`. Each thread keeps one open
+connection per database file; :meth:`ConnectionPool.transaction` may be
+nested and only the outermost level commits or rolls back.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+
+def _is_open(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.total_changes
+    except sqlite3.ProgrammingError:
+        return False
+    return True
+
+
+class ConnectionPool:
+    """Thread-local pool of connections keyed by database path."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def _connections(self) -> dict[Path, sqlite3.Connection]:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        return conns
+
+    @property
+    def depth(self) -> int:
+        """Number of open :meth:`transaction` blocks on the current thread."""
+        return getattr(self._local, "depth", 0)
+
+    def get(
+        self, path: Path, opener: Callable[[Path], sqlite3.Connection]
+    ) -> sqlite3.Connection:
+        """Return this thread's connection to *path*, opening it with *opener*."""
+        conns = self._connections()
+        conn = conns.get(path)
+        if conn is None or not _is_open(conn):
+            conn = conns[path] = opener(path)
+        return conn
+
+    def close_all(self) -> None:
+        """Close every connection owned by the current thread."""
+        conns = self._connections()
+        while conns:
+            _, conn = conns.popitem()
+            conn.close()
+        self._local.depth = 0
+
+    @contextmanager
+    def transaction(
+        self,
+        conn: sqlite3.Connection,
+        on_commit: Callable[[], None] | None = None,
+        on_rollback: Callable[[], None] | None = None,
+    ) -> Iterator[sqlite3.Connection]:
+        """Wrap *conn* in a transaction joined by nested calls.
+
+        The outermost level commits when its block completes and otherwise
+        rolls back, whatever ended the block, including ``KeyboardInterrupt``
+        and ``GeneratorExit``. Pending writes therefore never survive on the
+        pooled connection into an unrelated transaction. *on_commit* and
+        *on_rollback* run after the outermost commit or rollback.
+        """
+        depth = self.depth
+        self._local.depth = depth + 1
+        committed = False
+        try:
+            yield conn
+            if depth == 0:
+                conn.commit()
+                committed = True
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                if committed:
+                    if on_commit is not None:
+                        on_commit()
+                else:
+                    conn.rollback()
+                    if on_rollback is not None:
+                        on_rollback()
+
+
+__all__ = ["ConnectionPool"]
@@ -0,0 +1,282 @@
+"""Per-statement timing and slow-query logging for SQLite connections.
+
+Connections created with :class:`TracedConnection` report every statement to
+the active :class:`QueryRecorder`. While no recorder is installed the
+connection behaves like a plain :class:`sqlite3.Connection`.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds in milliseconds of the latency histogram buckets.
+BUCKETS_MS = (0.1, 1.0, 10.0, 100.0, 1000.0)
+# Rows a traced cursor fetches before reporting them to the recorder.
+FETCH_BATCH = 1000
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b-?\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace, literals and ``IN`` lists so similar SQL groups."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(?, ...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+@dataclass
+class StatementStats:
+    """Aggregated timings of one normalized statement."""
+
+    sql: str
+    calls: int = 0
+    rows: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    histogram: List[int] = field(default_factory=lambda: [0] * (len(BUCKETS_MS) + 1))
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+class QueryRecorder:
+    """Collect statement statistics and log statements slower than a threshold.
+
+    Slow statements are logged as warnings and, when *slow_log* is given,
+    appended to that file as tab-separated lines.
+    """
+
+    def __init__(
+        self, slow_threshold_ms: float | None = None, slow_log: Path | None = None
+    ) -> None:
+        self.slow_threshold_ms = slow_threshold_ms
+        self.slow_log = slow_log
+        self._stats: Dict[str, StatementStats] = {}
+        # Reentrant: a cursor released mid-update reports from ``__del__``.
+        self._lock = threading.RLock()
+
+    def _entry(self, sql: str) -> StatementStats:
+        entry = self._stats.get(sql)
+        if entry is None:
+            entry = self._stats[sql] = StatementStats(sql)
+        return entry
+
+    def record(self, sql: str, elapsed_ms: float, rows: int = 0) -> None:
+        """Add one complete execution of *sql* taking *elapsed_ms*."""
+        key = normalize_sql(sql)
+        self.add_call(key, elapsed_ms, rows)
+        self.check_slow(key, elapsed_ms, rows)
+
+    def add_call(self, key: str, elapsed_ms: float, rows: int = 0) -> None:
+        """Count one execution of the normalized statement *key*."""
+        with self._lock:
+            entry = self._entry(key)
+            entry.calls += 1
+            entry.rows += rows
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+            entry.histogram[bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+    def add_rows(self, key: str, rows: int, elapsed_ms: float) -> None:
+        """Attribute rows fetched after execution to the normalized *key*."""
+        with self._lock:
+            entry = self._entry(key)
+            entry.rows += rows
+            entry.total_ms += elapsed_ms
+
+    def check_slow(self, key: str, total_ms: float, rows: int) -> None:
+        """Log the normalized *key* if *total_ms* reached the slow threshold."""
+        if self.slow_threshold_ms is not None and total_ms >= self.slow_threshold_ms:
+            self._log_slow(key, total_ms, rows)
+
+    def _log_slow(self, sql: str, elapsed_ms: float, rows: int) -> None:
+        logger.warning("Slow query (%.1f ms, %d rows): %s", elapsed_ms, rows, sql)
+        if self.slow_log is not None:
+            line = f"{datetime.now().isoformat()}\t{elapsed_ms:.3f}\t{rows}\t{sql}\n"
+            with self.slow_log.open("a", encoding="utf-8") as fh:
+                fh.write(line)
+
+    def stats(self) -> List[StatementStats]:
+        """Return a snapshot of all statistics, slowest total time first."""
+        with self._lock:
+            snapshot = [
+                StatementStats(
+                    s.sql, s.calls, s.rows, s.total_ms, s.max_ms, list(s.histogram)
+                )
+                for s in self._stats.values()
+            ]
+        return sorted(snapshot, key=lambda s: s.total_ms, reverse=True)
+
+    def reset(self) -> None:
+        """Forget all collected statistics."""
+        with self._lock:
+            self._stats.clear()
+
+
+recorder: QueryRecorder | None = None
+
+
+def enable_tracing(new_recorder: QueryRecorder | None = None) -> QueryRecorder:
+    """Install *new_recorder* (or a fresh one) for all traced connections."""
+    global recorder
+    recorder = new_recorder or QueryRecorder()
+    return recorder
+
+
+def disable_tracing() -> None:
+    """Stop recording statements."""
+    global recorder
+    recorder = None
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that times executions and counts fetched rows.
+
+    The statement is normalized once per execution. Fetched rows and their
+    time are accumulated on the cursor and handed to the recorder every
+    :data:`FETCH_BATCH` rows, so streaming reads are not slowed down by
+    per-row bookkeeping. A statement is finished when its rows are exhausted,
+    the cursor runs another statement or is closed or released; only then is
+    the slow query threshold applied, to execution and fetch time combined.
+    """
+
+    _key: str | None = None
+    _total_ms = 0.0
+    _total_rows = 0
+    _pending_rows = 0
+    _pending_ms = 0.0
+
+    def execute(self, sql: str, parameters: Any = (), /) -> TracedCursor:
+        self._finish()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._report(sql, start)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> TracedCursor:
+        self._finish()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._report(sql, start)
+        return self
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def _report(self, sql: str, start: float) -> None:
+        elapsed = (time.perf_counter() - start) * 1000
+        if recorder is None:
+            return
+        rows = max(self.rowcount, 0)
+        self._key = normalize_sql(sql)
+        self._total_ms = elapsed
+        self._total_rows = rows
+        self._pending_rows = 0
+        self._pending_ms = 0.0
+        recorder.add_call(self._key, elapsed, rows)
+        if self.description is None:
+            self._finish()
+
+    def _flush(self) -> None:
+        if self._pending_rows and recorder is not None:
+            recorder.add_rows(self._key, self._pending_rows, self._pending_ms)
+        self._pending_rows = 0
+        self._pending_ms = 0.0
+
+    def _finish(self) -> None:
+        if self._key is None:
+            return
+        self._flush()
+        if recorder is not None:
+            recorder.check_slow(self._key, self._total_ms, self._total_rows)
+        self._key = None
+
+    def __del__(self) -> None:
+        self._finish()
+
+    def _fetched(self, rows: int, start: float, done: bool = False) -> None:
+        if self._key is None:
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        self._pending_rows += rows
+        self._pending_ms += elapsed
+        self._total_rows += rows
+        self._total_ms += elapsed
+        if done:
+            self._finish()
+        elif self._pending_rows >= FETCH_BATCH:
+            self._flush()
+
+    def fetchone(self) -> Any:
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(row is not None, start, row is None)
+        return row
+
+    def fetchmany(self, size: int | None = None) -> list[Any]:
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(len(rows), start, len(rows) < size)
+        return rows
+
+    def fetchall(self) -> list[Any]:
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), start, True)
+        return rows
+
+    def __next__(self) -> Any:
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(0, start, True)
+            raise
+        self._fetched(1, start)
+        return row
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose statements are reported to the active recorder."""
+
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+        if recorder is None:
+            return super().execute(sql, parameters)
+        return self.cursor(TracedCursor).execute(sql, parameters)
+
+    def executemany(self, sql: str, parameters: Any, /) -> sqlite3.Cursor:
+        if recorder is None:
+            return super().executemany(sql, parameters)
+        return self.cursor(TracedCursor).executemany(sql, parameters)
+
+
+__all__ = [
+    "BUCKETS_MS",
+    "FETCH_BATCH",
+    "QueryRecorder",
+    "StatementStats",
+    "TracedConnection",
+    "TracedCursor",
+    "disable_tracing",
+    "enable_tracing",
+    "normalize_sql",
+]
@@ -0,0 +1,137 @@
+"""Batch repository writes into a single ordered transaction."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import ExitStack
+from typing import Any, Iterable
+
+from pydantic import BaseModel
+
+from core import models
+from infra import db
+from infra.repositories import (
+    CharacterRepository,
+    EconomyProfileRepository,
+    FactionRepository,
+    IdentityMap,
+    LocationRepository,
+    TimelineEventRepository,
+    WorldRepository,
+)
+
+# Entities are written before the entities that refer to them.
+FLUSH_ORDER: tuple[tuple[type[BaseModel], type], ...] = (
+    (models.World, WorldRepository),
+    (models.Location, LocationRepository),
+    (models.Faction, FactionRepository),
+    (models.EconomyProfile, EconomyProfileRepository),
+    (models.Character, CharacterRepository),
+    (models.TimelineEvent, TimelineEventRepository),
+)
+
+
+def _model_type(entity: BaseModel) -> type[BaseModel]:
+    for model_type, _ in FLUSH_ORDER:
+        if isinstance(entity, model_type):
+            return model_type
+    raise TypeError(f"No repository for {type(entity).__name__}")
+
+
+class UnitOfWork:
+    """Collect creates and updates and write them in one transaction.
+
+    Pending work is flushed in :data:`FLUSH_ORDER` with one ``executemany``
+    per repository and operation. Used as a context manager the unit wraps
+    :func:`infra.db.transaction`: it flushes and commits when the block
+    exits cleanly and discards pending work and rolls back otherwise::
+
+        with UnitOfWork() as uow:
+            uow.add(models.World(name="Terra"))
+            uow.update(character_id, character)
+        world_ids = uow.created[models.World]
+    """
+
+    def __init__(self, seed: bool = False, cache: IdentityMap | None = None):
+        self.seed = seed
+        self.cache = cache
+        self.conn = None
+        self.created: dict[type[BaseModel], list[Any]] = {}
+        self._creates: dict[type[BaseModel], list[BaseModel]] = defaultdict(list)
+        self._updates: dict[type[BaseModel], dict[Any, BaseModel]] = defaultdict(dict)
+        self._stack: ExitStack | None = None
+
+    def __enter__(self) -> UnitOfWork:
+        self._stack = ExitStack()
+        self.conn = self._stack.enter_context(
+            db.transaction(self.seed, label="unit_of_work")
+        )
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        stack, self._stack = self._stack, None
+        self.conn = None
+        if exc_type is not None:
+            self._discard()
+            stack.__exit__(exc_type, exc, tb)
+            return
+        try:
+            # An error while flushing rolls the transaction back.
+            with stack:
+                self.flush()
+        except BaseException:
+            self._discard()
+            raise
+
+    def _discard(self) -> None:
+        # Entities read through the cache may reflect rolled-back writes.
+        self.clear()
+        if self.cache is not None:
+            self.cache.clear()
+
+    def add(self, entity: BaseModel) -> None:
+        """Schedule *entity* to be created."""
+        self._creates[_model_type(entity)].append(entity)
+
+    def add_all(self, entities: Iterable[BaseModel]) -> None:
+        """Schedule every entity in *entities* to be created."""
+        for entity in entities:
+            self.add(entity)
+
+    def update(self, entity_id: Any, entity: BaseModel) -> None:
+        """Schedule the row *entity_id* to be overwritten with *entity*.
+
+        A later update of the same row replaces an earlier pending one.
+        """
+        self._updates[_model_type(entity)][entity_id] = entity
+
+    def repository(self, model_type: type[BaseModel]) -> Any:
+        """Return the repository for *model_type* bound to the open transaction."""
+        if self.conn is None:
+            raise RuntimeError("UnitOfWork is not active")
+        return dict(FLUSH_ORDER)[model_type](self.conn, cache=self.cache)
+
+    def flush(self) -> dict[type[BaseModel], list[Any]]:
+        """Write all pending work and return the ids created per model type."""
+        with db.transaction(self.seed, label="unit_of_work") as conn:
+            for model_type, repository in FLUSH_ORDER:
+                creates = self._creates.get(model_type)
+                updates = self._updates.get(model_type)
+                if not creates and not updates:
+                    continue
+                repo = repository(conn, cache=self.cache)
+                if creates:
+                    ids = repo.create_many(creates)
+                    self.created.setdefault(model_type, []).extend(ids)
+                if updates:
+                    repo.update_many(updates)
+        self.clear()
+        return self.created
+
+    def clear(self) -> None:
+        """Forget all pending work."""
+        self._creates.clear()
+        self._updates.clear()
+
+
+__all__ = ["FLUSH_ORDER", "UnitOfWork"]
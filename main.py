@@ -9,6 +9,7 @@ from app.splash import maybe_show_splash
 from app.startup import detect_recent_workspace, handle_exception
 from app.window_factory import get_main_window
 from config import settings
+from infra.db import start_backups
 from shared.utils.fs import ensure_dir
 from ui.theme import apply_theme, load_theme
 
@@ -20,6 +21,7 @@ def main() -> None:
 
     module = sys.argv[1].lower() if len(sys.argv) > 1 else "editor"
     workspace = detect_recent_workspace()
+    start_backups()
     user_id = getpass.getuser()
     theme = load_theme(workspace.name, user_id)
     apply_theme(theme, workspace.name, user_id)
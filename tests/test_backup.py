@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from infra.backup import (
+    BackupScheduler,
+    RetentionPolicy,
+    create_backup,
+    list_backups,
+    prune_backups,
+    restore_backup,
+)
+
+
+def _make_db(path: Path, rows: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS t (v TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?)", [("x" * 100,)] * rows)
+    conn.commit()
+    conn.close()
+
+
+def test_dedupe_backup_skips_unchanged_and_restores(tmp_path):
+    db = tmp_path / "app.db"
+    backups = tmp_path / "backups"
+    _make_db(db, 1000)
+    t0 = datetime(2025, 1, 1, 12)
+
+    first = create_backup(db, backups, dedupe=True, now=t0)
+    assert first is not None and first.suffix == ".json"
+    assert create_backup(db, backups, dedupe=True, now=t0 + timedelta(hours=1)) is None
+
+    _make_db(db, 10)
+    second = create_backup(db, backups, dedupe=True, now=t0 + timedelta(hours=2))
+    assert second is not None
+
+    restored = tmp_path / "restored.db"
+    restore_backup(second, restored)
+    conn = sqlite3.connect(restored)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1010
+    conn.close()
+
+
+def test_prune_keeps_one_backup_per_bucket(tmp_path):
+    db = tmp_path / "app.db"
+    backups = tmp_path / "backups"
+    _make_db(db, 1)
+    start = datetime(2025, 1, 1)
+    for minutes in range(0, 6 * 60, 30):
+        create_backup(db, backups, now=start + timedelta(minutes=minutes))
+
+    policy = RetentionPolicy(hourly=3, daily=1, weekly=0)
+    removed = prune_backups(backups, policy, "app")
+
+    kept = [ts for ts, _ in list_backups(backups, "app")]
+    assert kept == [start + timedelta(hours=h, minutes=30) for h in (5, 4, 3)]
+    assert len(removed) == 9
+
+
+def test_scheduler_survives_failed_backups(tmp_path, monkeypatch):
+    scheduler = BackupScheduler(tmp_path / "app.db", tmp_path / "backups", 0.01)
+    calls = []
+    done = threading.Event()
+
+    def run_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        done.set()
+
+    monkeypatch.setattr(scheduler, "run_once", run_once)
+    scheduler.start()
+    try:
+        assert done.wait(5)
+    finally:
+        scheduler.stop()
+    assert len(calls) >= 2
+
+
+def test_scheduler_is_current_until_interval_and_changes(tmp_path):
+    db = tmp_path / "app.db"
+    _make_db(db, 1)
+    scheduler = BackupScheduler(db, tmp_path / "backups", interval=3600)
+    assert not scheduler.is_current()
+
+    latest = scheduler.run_once()
+    t0 = datetime.now()
+    assert scheduler.is_current(t0)
+    later = t0 + timedelta(hours=2)
+    assert scheduler.is_current(later)
+
+    stamp = latest.stat().st_mtime + 10
+    os.utime(db, (stamp, stamp))
+    assert not scheduler.is_current(later)
@@ -33,3 +33,116 @@ def test_generate_report_detects_inconsistencies() -> None:
     assert report.conflicting_dates == ["e1"]
     assert CharacterOverlap("c1", 15, ["l1", "l2"]) in report.character_overlaps
     assert report.duplicate_factions == ["A"]
+
+
+def test_coherence_index_reports_deltas() -> None:
+    from core.coherence import CoherenceIndex
+
+    index = CoherenceIndex(factions=[Faction(name="A")])
+    trip = TimelineEvent(
+        id="e2", title="Trip", year=15, character_ids=["c1"], location_ids=["l1"]
+    )
+    assert not index.add_event(trip)
+
+    other = TimelineEvent(
+        id="e3", title="Trip2", year=15, character_ids=["c1"], location_ids=["l2"]
+    )
+    delta = index.add_event(other)
+    assert delta.introduced.character_overlaps == [
+        CharacterOverlap("c1", 15, ["l1", "l2"])
+    ]
+    assert index.add_faction(Faction(name="A")).introduced.duplicate_factions == ["A"]
+
+    moved = other.model_copy(update={"year": 16})
+    delta = index.update_event(other, moved)
+    assert delta.resolved.character_overlaps == [
+        CharacterOverlap("c1", 15, ["l1", "l2"])
+    ]
+    assert not delta.introduced.character_overlaps
+
+    clash = moved.model_copy(update={"title": "Clash", "year": 20})
+    assert index.add_event(clash).introduced.conflicting_dates == ["e3"]
+    assert index.remove_event(clash).resolved.conflicting_dates == ["e3"]
+    assert index.remove_faction(Faction(name="A")).resolved.duplicate_factions == ["A"]
+    assert index.report() == generate_report([trip, moved], [Faction(name="A")])
+
+
+def test_coherence_index_matches_full_report_after_random_edits() -> None:
+    import random
+
+    from core.coherence import CoherenceIndex
+
+    rng = random.Random(7)
+    live: list[TimelineEvent] = []
+    index = CoherenceIndex()
+    for step in range(300):
+        if live and rng.random() < 0.4:
+            old = live.pop(rng.randrange(len(live)))
+            if rng.random() < 0.5:
+                index.remove_event(old)
+                continue
+            new = old.model_copy(update={"year": rng.randrange(4)})
+            index.update_event(old, new)
+            live.append(new)
+            continue
+        ev = TimelineEvent(
+            id=f"e{rng.randrange(20)}",
+            title=str(step),
+            year=rng.randrange(4),
+            character_ids=rng.sample(["c1", "c2", "c3"], 2),
+            location_ids=rng.sample(["l1", "l2", "l3"], rng.randrange(3)),
+        )
+        index.add_event(ev)
+        live.append(ev)
+
+    expected = generate_report(live, [])
+    report = index.report()
+    assert report.conflicting_dates == expected.conflicting_dates
+    key = lambda o: (o.character, o.year)
+    assert sorted(report.character_overlaps, key=key) == sorted(
+        expected.character_overlaps, key=key
+    )
+
+
+def test_sql_report_matches_model_report(tmp_path, monkeypatch) -> None:
+    import importlib
+
+    import config
+    import infra.db as _db
+    from infra import coherence as sql_coherence
+    from infra.repositories import FactionRepository, TimelineEventRepository
+
+    monkeypatch.setenv("APP_WORKSPACE", str(tmp_path))
+    importlib.reload(config)
+    importlib.reload(_db)
+    events = [
+        TimelineEvent(
+            id="e2", title="Trip1", year=15, character_ids=["c1"], location_ids=["l1"]
+        ),
+        TimelineEvent(
+            id="e3",
+            title="Trip2",
+            year=15,
+            character_ids=["c1", "c2"],
+            location_ids=["l2", "l3"],
+        ),
+        TimelineEvent(id="e4", title="Home", year=16, character_ids=["c1"]),
+    ]
+    factions = [Faction(name=n) for n in ("B", "A", "B", "A", "A")]
+    try:
+        with _db.transaction() as conn:
+            TimelineEventRepository(conn).create_many(events)
+            FactionRepository(conn).create_many(factions)
+            report = sql_coherence.generate_report(conn)
+            assert sql_coherence.generate_report(conn, project_id="other") == (
+                generate_report([], [])
+            )
+    finally:
+        _db.close_connections()
+
+    assert report == generate_report(events, factions)
+    assert report.character_overlaps == [
+        CharacterOverlap("c1", 15, ["l1", "l2", "l3"]),
+        CharacterOverlap("c2", 15, ["l2", "l3"]),
+    ]
+    assert report.duplicate_factions == ["B", "A"]
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core import coherence_rules
+from core.coherence_rules import RULES, WorldSnapshot, _cycles, partition, run_rules
+from core.models import Character, Faction
+from core.timeline.service import Evento
+
+
+class _Era:
+    def __init__(self, nome: str, inicio: int, fim: int) -> None:
+        self.nome, self.inicio, self.fim = nome, inicio, fim
+
+
+def _world() -> WorldSnapshot:
+    eventos = [
+        Evento("Coroação", 10, id="a", era="Pax", personagens=["c1"]),
+        Evento("Revolta", 30, id="b", era="Pax", depende_de=["Coroação", "Sumiço"]),
+        Evento("Cerco", 5, id="c", era="Pax", depende_de=["Queda"]),
+        Evento("Queda", 6, id="d", depende_de=["Cerco"]),
+    ]
+    characters = {
+        "c1": Character(name="Ana", birth_year=12, faction="Guilda"),
+        "c2": Character(name="Rui", birth_year=0, faction="Ordem"),
+    }
+    return WorldSnapshot.from_eventos(
+        eventos, [_Era("Pax", 0, 20)], characters, [Faction(name="Guilda")]
+    )
+
+
+def _summary(report):
+    return sorted((i.rule, i.entity) for i in report.issues)
+
+
+def test_rules_report_issues_with_timings() -> None:
+    report = run_rules(_world(), workers=0, shards=3)
+
+    assert _summary(report) == [
+        ("birth_before_appearance", "a"),
+        ("dangling_dependency", "b"),
+        ("dependency_cycle", "c"),
+        ("era_bounds", "b"),
+        ("missing_faction", "c2"),
+    ]
+    cycle = next(i for i in report.issues if i.rule == "dependency_cycle")
+    assert cycle.message == "Dependency cycle: c -> d -> c"
+    assert set(report.timings) == {"generate_report", *RULES}
+    assert report.conflicting_dates == [] and report.duplicate_factions == []
+    assert coherence_rules._worker_context is None
+
+
+def test_partition_puts_each_entity_in_one_slice() -> None:
+    world = _world()
+    parts = partition(world, 3)
+
+    assert sorted(ev[0] for p in parts for ev in p.events) == ["a", "b", "c", "d"]
+    assert sorted(c[0] for p in parts for c in p.characters) == ["c1", "c2"]
+    assert sorted(e for p in parts for e in p.depende_de) == ["b", "c", "d"]
+    event = next(ev for p in parts for ev in p.events if ev[0] == "a")
+    assert event == ("a", "Coroação", 10, "Pax", ("c1",))
+    assert _summary(run_rules(world, workers=0, shards=1)) == _summary(
+        run_rules(world, workers=0, shards=7)
+    )
+
+
+def test_rules_run_in_process_pool() -> None:
+    world = _world()
+    pooled = run_rules(world, ["era_bounds", "dependency_cycle"], workers=2)
+    assert _summary(pooled) == [("dependency_cycle", "c"), ("era_bounds", "b")]
+    assert _summary(run_rules(world, workers=2)) == _summary(
+        run_rules(world, workers=0)
+    )
+
+
+def test_cycles_handles_self_loops_and_long_chains() -> None:
+    chain = {str(i): [str(i + 1)] for i in range(5000)}
+    chain["5000"] = ["0"]
+    assert len(_cycles(chain)[0]) == 5001
+    assert _cycles({"x": ["x"], "y": ["z"]}) == [["x"]]
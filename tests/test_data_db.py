@@ -0,0 +1,235 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data import db
+
+
+@pytest.fixture
+def world_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_FILE", tmp_path / "world.db")
+    monkeypatch.setattr(db, "JSON_EXPORT", tmp_path / "world_export.json")
+    yield db
+    db.close_connections()
+
+
+def test_connection_is_reused_per_thread(world_db):
+    conn = world_db.get_connection()
+    assert world_db.get_connection() is conn
+    mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_create_entities_share_registry_and_export(world_db):
+    gid = world_db.create_governo("Império", tipo="monarquia")
+    sid = world_db.create_assentamento("Vila", governo_id=gid, imposto_base=1.5)
+    assert world_db.create_governo("Império") == gid
+
+    data = json.loads(world_db.JSON_EXPORT.read_text(encoding="utf-8"))
+    assert {r["name"] for r in data["entity_registry"]} == {"Império", "Vila"}
+    assert data["assentamentos"][0]["id"] == sid
+
+
+def test_transaction_rolls_back_on_error(world_db):
+    world_db.init_db()
+    with pytest.raises(RuntimeError):
+        with world_db.transaction() as conn:
+            world_db._register_entity("governo", "Efêmero", conn)
+            raise RuntimeError("boom")
+    count = (
+        world_db.get_connection()
+        .execute("SELECT COUNT(*) FROM entity_registry")
+        .fetchone()[0]
+    )
+    assert count == 0
+
+
+def test_interrupted_transaction_rolls_back_and_clears_cache(world_db):
+    world_db.init_db()
+    with pytest.raises(KeyboardInterrupt):
+        with world_db.transaction() as conn:
+            world_db._register_entity("governo", "Efêmero", conn)
+            raise KeyboardInterrupt
+    assert world_db.registry_cache.get("governo", "Efêmero") is None
+
+    with world_db.transaction():
+        pass
+    count = (
+        world_db.get_connection()
+        .execute("SELECT COUNT(*) FROM entity_registry")
+        .fetchone()[0]
+    )
+    assert count == 0
+
+
+def test_export_waits_for_the_outer_commit(world_db):
+    world_db.create_governo("Império")
+    with pytest.raises(RuntimeError):
+        with world_db.transaction():
+            world_db.create_governo("Fantasma")
+            assert "Fantasma" not in world_db.JSON_EXPORT.read_text(encoding="utf-8")
+            raise RuntimeError("boom")
+    world_db.flush_export()
+    assert "Fantasma" not in world_db.JSON_EXPORT.read_text(encoding="utf-8")
+
+    with world_db.transaction():
+        world_db.create_governo("Reino")
+    data = json.loads(world_db.JSON_EXPORT.read_text(encoding="utf-8"))
+    assert {r["nome"] for r in data["governos"]} == {"Império", "Reino"}
+
+
+def test_debounced_per_table_export_writes_only_dirty_tables(world_db, monkeypatch):
+    monkeypatch.setattr(world_db, "EXPORT_MODE", "immediate")
+    monkeypatch.setattr(world_db, "EXPORT_LAYOUT", "combined")
+    monkeypatch.setattr(world_db, "EXPORT_DELAY", 2.0)
+    world_db.configure_export(mode="debounced", layout="per_table", delay=60)
+
+    world_db.create_planeta("Arrakis")
+    out_dir = world_db.JSON_EXPORT.with_suffix("")
+    assert not out_dir.exists()
+
+    world_db.flush_export()
+    written = sorted(p.stem for p in out_dir.glob("*.json"))
+    assert written == ["entity_registry", "planetas"]
+    rows = json.loads((out_dir / "planetas.json").read_text(encoding="utf-8"))
+    assert rows[0]["nome"] == "Arrakis"
+
+
+def test_debounced_export_uses_one_flusher_thread(world_db, monkeypatch):
+    import threading
+    import time
+
+    monkeypatch.setattr(world_db, "EXPORT_MODE", "debounced")
+    monkeypatch.setattr(world_db, "EXPORT_LAYOUT", "combined")
+    monkeypatch.setattr(world_db, "EXPORT_DELAY", 0.05)
+
+    before = threading.active_count()
+    for i in range(20):
+        world_db.create_governo(f"G{i}")
+    assert threading.active_count() <= before + 1
+    assert not world_db.JSON_EXPORT.exists()
+
+    deadline = time.monotonic() + 5
+    while not world_db.JSON_EXPORT.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with world_db._export_lock:
+        data = json.loads(world_db.JSON_EXPORT.read_text(encoding="utf-8"))
+    assert len(data["governos"]) == 20
+
+
+def test_create_many_resolves_existing_and_new_names(world_db, monkeypatch):
+    monkeypatch.setattr(world_db, "MAX_PARAMS", 2)
+    existing = world_db.create_assentamento("Vila 0")
+
+    ids = world_db.create_assentamentos_many(
+        [{"nome": f"Vila {i}", "imposto_base": float(i)} for i in range(5)]
+    )
+
+    assert ids[0] == existing
+    assert len(set(ids)) == 5
+    rows = (
+        world_db.get_connection()
+        .execute("SELECT COUNT(*), SUM(imposto_base) FROM assentamentos")
+        .fetchone()
+    )
+    assert rows == (5, 10.0)
+
+
+def test_export_reader_streams_rows_across_small_reads():
+    doc = json.dumps({"ligas": [], "governos": [{"id": "g1", "nome": "Ñ {x}"}] * 3})
+    reader = db._ExportReader(io.StringIO(doc), read_size=7)
+    rows = list(reader.rows())
+    assert rows[0] == ("ligas", None)
+    assert rows[1:] == [("governos", {"id": "g1", "nome": "Ñ {x}"})] * 3
+
+
+def test_import_json_batches_and_reports_progress(world_db):
+    world_db.create_governos_many([{"nome": f"G{i}"} for i in range(5)])
+    world_db.create_planeta("Solo")
+    world_db.export_json()
+    with world_db.transaction() as conn:
+        conn.execute("DELETE FROM governos")
+
+    seen = []
+    counts = world_db.import_json(
+        batch_size=2, progress=lambda table, n: seen.append((table, n))
+    )
+
+    assert counts["governos"] == 5 and counts["entity_registry"] == 6
+    assert ("governos", 2) in seen and ("governos", 5) in seen
+    total = world_db.get_connection().execute("SELECT COUNT(*) FROM governos")
+    assert total.fetchone()[0] == 5
+
+
+def test_registry_cache_serves_repeat_lookups(world_db, monkeypatch):
+    monkeypatch.setattr(world_db, "registry_cache", world_db.RegistryCache(maxsize=2))
+    gids = world_db.create_governos_many([{"nome": n} for n in ("A", "B", "C")])
+    assert len(world_db.registry_cache) == 2
+
+    statements = []
+    world_db.get_connection().set_trace_callback(statements.append)
+    resolved = world_db.resolve_many("governo", ["B", "C", "missing"])
+    assert resolved == {"B": gids[1], "C": gids[2]}
+    assert len(statements) == 1 and "'missing'" in statements[0]
+
+    assert world_db.resolve_many("governo", ["A"]) == {"A": gids[0]}
+    world_db.get_connection().set_trace_callback(None)
+
+
+def test_region_closure_answers_subtree_queries(world_db):
+    reino = world_db.create_regiao("Reino")
+    norte = world_db.create_regiao("Norte", pai_id=reino)
+    vale = world_db.create_regiao("Vale", pai_id=norte)
+    sul = world_db.create_regiao("Sul", pai_id=reino)
+    world_db.create_assentamentos_many(
+        [
+            {"nome": "A", "regiao_id": vale, "imposto_base": 2.0},
+            {"nome": "B", "regiao_id": norte, "imposto_base": 3.0},
+            {"nome": "C", "regiao_id": sul, "imposto_base": 5.0},
+        ]
+    )
+
+    assert world_db.regiao_ancestors(vale) == [norte, reino]
+    assert set(world_db.regiao_descendants(reino)) == {norte, vale, sul}
+    assert world_db.regiao_settlement_count(norte) == 2
+    assert world_db.regiao_tax_total(reino) == 10.0
+
+    world_db.create_regiao("Norte", pai_id=sul)
+    assert world_db.regiao_ancestors(vale) == [norte, sul, reino]
+    assert world_db.regiao_tax_total(sul) == 10.0
+
+    world_db.export_json()
+    world_db.import_json()
+    assert world_db.regiao_ancestors(vale) == [norte, sul, reino]
+
+
+def test_diplomacy_index_follows_writes(world_db):
+    a, b, c, d = world_db.create_governos_many([{"nome": n} for n in "ABCD"])
+    world_db.create_relacao(a, b, "aliança")
+    index = world_db.diplomacy_index()
+    assert index.allies_within(a, 2) == {b}
+
+    world_db.create_relacao(b, c, "aliança")
+    war = world_db.create_relacao(d, b, "guerra")
+    liga = world_db.create_liga("Liga do Norte")
+    world_db.add_liga_membro(liga, a)
+    world_db.add_liga_membro(liga, b)
+
+    assert index.allies_within(a, 1) == {b}
+    assert index.allies_within(a, 2) == {b, c}
+    assert index.shared_leagues(a, b) == {liga}
+    assert index.at_war_with_league(liga) == {d}
+
+    world_db.remove_relacao(war)
+    world_db.remove_liga_membro(liga, b)
+    assert index.at_war_with_league(liga) == set()
+
+    world_db.reset_diplomacy_index()
+    reloaded = world_db.diplomacy_index()
+    assert reloaded.allies_within(c, 3) == {a, b}
+    assert reloaded.members(liga) == {a}
@@ -6,7 +6,7 @@ import pytest
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from core.models import Character, TimelineEvent
-from core.services import validate_event_characters
+from core.services import find_birth_violations, validate_event_characters
 
 
 def test_validate_event_characters_allows_valid_event() -> None:
@@ -20,3 +20,39 @@ def test_validate_event_characters_raises_for_early_event() -> None:
     event = TimelineEvent(id="e1", title="Birth", year=0, character_ids=["c1"])
     with pytest.raises(ValueError):
         validate_event_characters(event, {"c1": char})
+
+
+def test_find_birth_violations_reports_every_pair() -> None:
+    chars = {
+        "c1": Character(name="Alice", birth_year=-10),
+        "c2": Character(name="Bob", birth_year=10),
+    }
+    events = [
+        TimelineEvent(id="e1", title="Meeting", year=0, character_ids=["c1", "c2"]),
+        TimelineEvent(id="e2", title="Feast", year=20, character_ids=["c2", "ghost"]),
+        TimelineEvent(id="e3", title="Omen", year=-20, character_ids=["c1", "c2"]),
+    ]
+
+    violations = find_birth_violations(events, chars)
+
+    assert [(v.event.id, v.character_id) for v in violations] == [
+        ("e1", "c2"),
+        ("e3", "c1"),
+        ("e3", "c2"),
+    ]
+    assert find_birth_violations([], chars) == []
+
+
+def test_birth_violation_positions_match_with_numpy(monkeypatch) -> None:
+    pytest.importorskip("numpy")
+    from array import array
+
+    from core.services.validations import _earlier_positions
+
+    years = array("q", [0, 20, -20, 5, 2**40])
+    births = array("q", [10, 10, -10, 5, 2**41])
+    assert _earlier_positions(years, births) == [0, 2, 4]
+    assert _earlier_positions(array("q"), array("q")) == []
+
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    assert _earlier_positions(years, births) == [0, 2, 4]
@@ -29,3 +29,268 @@ def test_character_repo_create_and_list(tmp_path, monkeypatch):
         assert character is not None and character.name == "Eve"
         assert any(c.name == "Eve" for c in repo.list())
 
+
+def test_transaction_reuses_connection_and_skips_migrations(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_WORKSPACE", str(tmp_path))
+    import config
+    import infra.db as _db
+
+    importlib.reload(config)
+    importlib.reload(_db)
+
+    with _db.transaction() as conn:
+        first = conn
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        assert version == len(list(_db.MIGRATIONS_DIR.glob("*.sql")))
+
+    statements = []
+    first.set_trace_callback(statements.append)
+    with _db.transaction() as conn:
+        assert conn is first
+    first.set_trace_callback(None)
+    assert not any("schema_migrations" in sql for sql in statements)
+
+    _db.close_connections()
+    with _db.transaction() as conn:
+        assert conn is not first
+        assert CharacterRepository(conn).list() == []
+    _db.close_connections()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_WORKSPACE", str(tmp_path))
+    import config
+    import infra.db as _db
+
+    importlib.reload(config)
+    importlib.reload(_db)
+    yield _db
+    _db.close_connections()
+
+
+def test_create_many_returns_ids_in_order(db):
+    from core.models import TimelineEvent
+    from infra.repositories import LocationRepository, TimelineEventRepository
+
+    with db.transaction() as conn:
+        repo = CharacterRepository(conn)
+        first = repo.create(Character(name="Solo", birth_year=0))
+        ids = repo.create_many(
+            [Character(name="Ana", birth_year=1), {"name": "Rui", "birth_year": 2}]
+        )
+        assert ids == [first + 1, first + 2]
+        assert [repo.find(i).name for i in ids] == ["Ana", "Rui"]
+        assert repo.create_many([]) == []
+
+        events = TimelineEventRepository(conn)
+        event_ids = events.create_many(
+            [{"id": "e1", "title": "A", "year": 1, "character_ids": ["c1", "c2"]}]
+        )
+        assert event_ids == ["e1"]
+        assert events.find("e1").character_ids == ["c1", "c2"]
+
+    with pytest.raises(ValueError):
+        with db.transaction() as conn:
+            LocationRepository(conn).create_many(
+                [{"name": "Ok", "population": 1}, {"name": "Bad", "population": -1}]
+            )
+    with db.transaction() as conn:
+        assert LocationRepository(conn).list() == []
+
+
+def test_interrupted_transaction_is_rolled_back(db):
+    with pytest.raises(KeyboardInterrupt):
+        with db.transaction() as conn:
+            CharacterRepository(conn).create(Character(name="Ghost", birth_year=0))
+            raise KeyboardInterrupt
+
+    with db.transaction() as conn:
+        CharacterRepository(conn).create(Character(name="Eve", birth_year=1))
+    with db.transaction() as conn:
+        assert [c.name for c in CharacterRepository(conn).list()] == ["Eve"]
+
+
+def test_iter_and_keyset_pages(db):
+    from infra.repositories import FactionRepository
+
+    with db.transaction() as conn:
+        repo = FactionRepository(conn)
+        ids = repo.create_many([{"name": f"F{i}"} for i in range(5)])
+        conn.execute("UPDATE factions SET project_id = 'p1' WHERE id != ?", (ids[2],))
+
+        assert [f.name for f in repo.iter(chunk_size=2)] == [f"F{i}" for i in range(5)]
+
+        names, after = [], None
+        while True:
+            page = repo.page(after, limit=2, project_id="p1")
+            names += [f.name for f in page.items]
+            if page.next_after is None:
+                break
+            after = page.next_after
+        assert names == ["F0", "F1", "F3", "F4"]
+        assert repo.page(limit=10, created_before="1970-01-01").items == []
+
+
+def test_timeline_event_links_backfill_and_queries(db):
+    from core.models import TimelineEvent
+    from infra.repositories import TimelineEventRepository
+
+    with db.transaction() as conn:
+        conn.execute(
+            "INSERT INTO timeline_events (id, title, year, scope, description, "
+            "characters, locations, tags) "
+            "VALUES ('old', 'Legacy', 5, 'local', '', 'c1,c2', 'l1', '')"
+        )
+    migration = db.MIGRATIONS_DIR / "20251017_timeline_event_links.sql"
+    db.connect().executescript(migration.read_text(encoding="utf-8"))
+
+    with db.transaction() as conn:
+        repo = TimelineEventRepository(conn)
+        repo.create(TimelineEvent(id="e2", title="B", year=1, character_ids=["c2"]))
+        repo.create_many(
+            [
+                {
+                    "id": "e3",
+                    "title": "C",
+                    "year": 9,
+                    "location_ids": ["l1"],
+                    "tags": ["x"],
+                }
+            ]
+        )
+
+        assert [e.id for e in repo.events_for_character("c2")] == ["e2", "old"]
+        assert [e.id for e in repo.events_at_location("l1")] == ["old", "e3"]
+        assert [e.id for e in repo.events_with_tag("x")] == ["e3"]
+
+        conn.execute("DELETE FROM timeline_events WHERE id = 'old'")
+        assert repo.events_for_character("c1") == []
+
+
+def test_identity_map_shared_between_repositories(db):
+    from infra.repositories import IdentityMap, WorldRepository
+
+    cache = IdentityMap(maxsize=2)
+    with db.transaction() as conn:
+        chars = CharacterRepository(conn, cache=cache)
+        worlds = WorldRepository(conn, cache=cache)
+        cid = chars.create(Character(name="Eve", birth_year=0))
+        wid = worlds.create_many([{"name": "Terra"}])[0]
+
+        first = chars.find(cid)
+        assert chars.find(cid) is first
+        assert worlds.find(wid).name == "Terra"
+        assert (cache.hits, cache.misses) == (1, 2)
+
+        assert CharacterRepository(conn, cache=cache).find(cid) is first
+        cache.invalidate("characters", cid)
+        assert chars.find(cid) is not first
+        assert len(cache) == 2
+
+
+def test_identity_map_drops_entries_of_rolled_back_transactions(db):
+    from infra.repositories import IdentityMap
+
+    cache = IdentityMap()
+    with db.transaction() as conn:
+        repo = CharacterRepository(conn, cache=cache)
+        eve_id = repo.create(Character(name="Eve", birth_year=0))
+        eve = repo.find(eve_id)
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            repo = CharacterRepository(conn, cache=cache)
+            ghost = repo.create(Character(name="Ghost", birth_year=0))
+            assert repo.find(ghost).name == "Ghost"
+            raise RuntimeError("boom")
+
+    with db.transaction() as conn:
+        repo = CharacterRepository(conn, cache=cache)
+        assert repo.find(ghost) is None
+        assert [c.name for c in repo.list()] == ["Eve"]
+        assert repo.find(eve_id) is eve
+
+
+def test_find_many_chunks_and_uses_cache(db, monkeypatch):
+    from infra.repositories import IdentityMap, TimelineEventRepository, _common
+
+    monkeypatch.setattr(_common, "MAX_PARAMS", 2)
+    cache = IdentityMap()
+    with db.transaction() as conn:
+        repo = CharacterRepository(conn, cache=cache)
+        ids = repo.create_many([{"name": f"C{i}", "birth_year": i} for i in range(5)])
+        cached = repo.find(ids[0])
+
+        found = repo.find_many([*ids, 999, ids[1]])
+        assert set(found) == set(ids)
+        assert found[ids[0]] is cached
+        assert found[ids[4]].name == "C4"
+
+        events = TimelineEventRepository(conn)
+        events.create_many([{"id": f"e{i}", "title": "T", "year": i} for i in range(3)])
+        assert sorted(events.find_many(["e2", "e0", "nope"])) == ["e0", "e2"]
+
+
+def test_full_text_search_ranks_and_follows_writes(db):
+    from core.models import Faction
+    from infra.repositories import FactionRepository, TimelineEventRepository
+
+    with db.transaction() as conn:
+        factions = FactionRepository(conn)
+        factions.create_many(
+            [
+                {"name": "Guilda dos Mercadores", "summary": "Comércio no porto"},
+                {"name": "Ordem", "summary": "Guarda os mercadores do norte"},
+            ]
+        )
+        factions.create(Faction(name="Legião", summary="Exército"))
+        events = TimelineEventRepository(conn)
+        events.create_many(
+            [{"id": "e1", "title": "Queda da Ponte", "year": 3, "tags": ["guerra"]}]
+        )
+
+        hits = factions.search("mercador")
+        assert [h.item.name for h in hits] == ["Guilda dos Mercadores", "Ordem"]
+        assert hits[0].score > 0 and "[Mercadores]" in hits[0].snippet
+        assert [h.item.name for h in factions.search("comercio")] == [
+            "Guilda dos Mercadores"
+        ]
+        assert factions.search('"(') == [] and factions.search("  ") == []
+
+        assert [h.item.id for h in events.search("guerra ponte")] == ["e1"]
+        conn.execute("UPDATE timeline_events SET title = 'Paz' WHERE id = 'e1'")
+        assert events.search("ponte") == []
+        events.update_many({"e1": {"id": "e2", "title": "Paz", "year": 3}})
+        assert [h.item.id for h in events.search("paz")] == ["e2"]
+        conn.execute("DELETE FROM timeline_events WHERE id = 'e2'")
+        assert events.search("paz") == []
+        conn.execute("DELETE FROM factions WHERE name = 'Ordem'")
+        assert len(factions.search("mercadores")) == 1
+
+
+def test_timeline_between_pages_in_year_order(db):
+    from infra.repositories import TimelineEventRepository
+
+    with db.transaction() as conn:
+        repo = TimelineEventRepository(conn)
+        repo.create_many(
+            [
+                {"id": f"e{i}", "title": "T", "year": 10 - i, "era": era}
+                for i, era in enumerate(["a", "b", "a", "a", "b", "a"])
+            ]
+        )
+
+        first = repo.between(6, 9, limit=2)
+        assert [(e.year, e.id) for e in first.items] == [(6, "e4"), (7, "e3")]
+        rest = repo.between(6, 9, after=first.next_after, limit=2)
+        assert [e.id for e in rest.items] == ["e2", "e1"]
+        assert repo.between(6, 9, after=rest.next_after, limit=2).items == []
+        assert [e.id for e in repo.between(0, 10, era="b").items] == ["e4", "e1"]
+
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM timeline_events "
+            "WHERE project_id = ? AND era = ? AND year BETWEEN ? AND ? "
+            "ORDER BY year",
+            ("p", "a", 0, 5),
+        ).fetchall()
+        assert "idx_timeline_events_project_era_year" in str([tuple(r) for r in plan])
@@ -0,0 +1,28 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from infra.sqlite_profile import apply_profile, resolve_profile
+
+
+def test_apply_profile_sets_pragmas(tmp_path):
+    conn = sqlite3.connect(tmp_path / "t.db")
+    apply_profile(conn, "fast", overrides="cache_size=-1234")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -1234
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+    conn.close()
+
+
+def test_resolve_profile_rejects_unknown_values():
+    with pytest.raises(ValueError):
+        resolve_profile("turbo", overrides="")
+    with pytest.raises(ValueError):
+        resolve_profile("safe", overrides="foreign_keys=ON")
+    with pytest.raises(ValueError):
+        resolve_profile("safe", overrides="cache_size=1; DROP TABLE x")
@@ -0,0 +1,72 @@
+import importlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.models import Character
+from infra import tracing
+from infra.repositories import CharacterRepository
+
+
+def test_normalize_sql_groups_literals_and_in_lists():
+    sql = "SELECT *  FROM t\n WHERE a = 'x' AND b IN (?, ?, ?) AND c > 10"
+    assert tracing.normalize_sql(sql) == (
+        "SELECT * FROM t WHERE a = ? AND b IN (?, ...) AND c > ?"
+    )
+
+
+def test_tracing_records_statements_and_slow_log(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_WORKSPACE", str(tmp_path))
+    import config
+    import infra.db as _db
+
+    importlib.reload(config)
+    importlib.reload(_db)
+
+    _db.enable_tracing(slow_threshold_ms=0)
+    try:
+        with _db.transaction(label="seed") as conn:
+            repo = CharacterRepository(conn)
+            repo.create(Character(name="Eve", birth_year=-20))
+            repo.create(Character(name="Bob", birth_year=-10))
+            assert len(repo.list()) == 2
+        stats = {s.sql: s for s in _db.query_stats()}
+    finally:
+        tracing.disable_tracing()
+        _db.close_connections()
+
+    insert = next(
+        s for sql, s in stats.items() if sql.startswith("INSERT INTO characters")
+    )
+    select = next(s for sql, s in stats.items() if sql.startswith("SELECT name"))
+    assert insert.calls == 2 and insert.rows == 2
+    assert select.calls == 1 and select.rows == 2
+    assert sum(insert.histogram) == 2
+    assert stats["TRANSACTION seed"].calls == 1
+    assert "INSERT INTO characters" in _db.SLOW_QUERY_LOG.read_text(encoding="utf-8")
+
+
+def test_slow_threshold_covers_fetch_time(tmp_path, monkeypatch):
+    import sqlite3
+    import time
+
+    monkeypatch.setattr(tracing, "FETCH_BATCH", 4)
+    conn = sqlite3.connect(":memory:", factory=tracing.TracedConnection)
+    conn.create_function("nap", 1, lambda x: time.sleep(0.002) or x)
+    conn.execute("CREATE TABLE t (a)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(30)])
+
+    slow_log = tmp_path / "slow.log"
+    recorder = tracing.enable_tracing(tracing.QueryRecorder(30, slow_log))
+    try:
+        cur = conn.execute("SELECT nap(a) FROM t")
+        assert not slow_log.exists()
+        assert sum(1 for _ in cur) == 30
+    finally:
+        tracing.disable_tracing()
+        conn.close()
+
+    select = next(s for s in recorder.stats() if s.sql.startswith("SELECT nap"))
+    assert select.calls == 1 and select.rows == 30 and select.total_ms >= 30
+    assert "\t30\tSELECT nap(a) FROM t" in slow_log.read_text(encoding="utf-8")
@@ -0,0 +1,75 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.models import Character, Location, TimelineEvent, World
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_WORKSPACE", str(tmp_path))
+    import config
+    import infra.db as _db
+
+    importlib.reload(config)
+    importlib.reload(_db)
+    yield _db
+    _db.close_connections()
+
+
+def test_unit_of_work_flushes_in_dependency_order(db):
+    from infra.unit_of_work import UnitOfWork
+
+    conn = db.connect()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    with UnitOfWork() as uow:
+        uow.add(TimelineEvent(id="e1", title="Fundação", year=1, character_ids=["1"]))
+        uow.add_all(Character(name=f"C{i}", birth_year=i) for i in range(3))
+        uow.add(Location(name="Porto", population=100))
+        uow.add(World(name="Terra"))
+        assert statements == []
+    conn.set_trace_callback(None)
+
+    tables = [s.split()[2] for s in statements if s.startswith("INSERT INTO")]
+    order = list(dict.fromkeys(tables))
+    assert order[:4] == ["worlds", "locations", "characters", "timeline_events"]
+    assert len(uow.created[Character]) == 3
+    assert uow.created[TimelineEvent] == ["e1"]
+
+    char_id = uow.created[Character][1]
+    with UnitOfWork() as uow:
+        uow.update(char_id, Character(name="Old", birth_year=-5))
+        uow.update(char_id, Character(name="Renamed", birth_year=-5))
+        uow.update("e1", TimelineEvent(id="e1", title="Fundação", year=2))
+        events = uow.repository(TimelineEvent)
+        assert events.events_for_character("1")[0].year == 1
+
+    assert events.find("e1").year == 2
+    assert events.events_for_character("1") == []
+    with db.transaction() as conn:
+        row = conn.execute("SELECT name FROM characters WHERE id = ?", (char_id,))
+        assert row.fetchone()[0] == "Renamed"
+
+
+def test_unit_of_work_discards_work_on_error(db):
+    from infra.repositories import IdentityMap, WorldRepository
+    from infra.unit_of_work import UnitOfWork
+
+    cache = IdentityMap()
+    with pytest.raises(RuntimeError):
+        with UnitOfWork(cache=cache) as uow:
+            uow.add(World(name="Terra"))
+            uow.flush()
+            WorldRepository(uow.conn, cache=cache).find(uow.created[World][0])
+            raise RuntimeError("boom")
+
+    assert len(cache) == 0
+    with db.transaction() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM worlds").fetchone()[0] == 0
+    with pytest.raises(TypeError):
+        UnitOfWork().add(object())
@@ -21,3 +21,14 @@ def test_resolve_conflicts_detects_same_id_different_year():
     ev2 = Evento(titulo="E2", instante=12, id="dup")
     s = TimelineService([ev1, ev2])
     assert s.resolve_conflicts() == ["dup"]
+
+
+def test_add_event_keeps_order_and_shares_assigned_list():
+    shared = [Evento(titulo="Z", instante=9), Evento(titulo="A", instante=1)]
+    s = TimelineService()
+    s.eventos = shared
+    assert s.eventos is shared
+    s.add_event(Evento(titulo="M", instante=5))
+    s.add_event(Evento(titulo="B", instante=5))
+    s.add_events([Evento(titulo="Y", instante=0), Evento(titulo="C", instante=5)])
+    assert [e.titulo for e in shared] == ["Y", "A", "B", "C", "M", "Z"]
@@ -66,6 +66,7 @@ from spellchecker import SpellChecker
 
 from core.io import export_project_zip, export_text, import_batch
 from core.timeline.service import timeline_service
+from infra.sqlite_profile import apply_profile
 from shared.config import config_manager
 from shared.constants import (
     APP_NAME,
@@ -1005,6 +1006,7 @@ class EditorWindow(QMainWindow):
     def open_conlang(self):
         db_path = self.workspace / "linguas.db"
         conn = sqlite3.connect(db_path)
+        apply_profile(conn)
         w = ConlangWidget(conn, self)
         w.setWindowTitle("Dicionário de Língua Inventada")
         w.resize(1100, 700)
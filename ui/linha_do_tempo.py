@@ -270,8 +270,8 @@ class PageEventos(QWidget):
         )
 
     def save(self):
-        self.service.eventos.clear()
         eras_nomes = {e.nome for e in self.tl.eras}
+        novos: List[Evento] = []
         for r in range(self.tbl.rowCount()):
             try:
                 titulo = self.tbl.item(r, 0).text() if self.tbl.item(r, 0) else ""
@@ -303,7 +303,7 @@ class PageEventos(QWidget):
                         raise ValueError(
                             f"Personagem '{pid}' aparece antes de nascer"
                         )
-                self.service.add_event(
+                novos.append(
                     Evento(
                         titulo=titulo,
                         instante=instante,
@@ -319,6 +319,9 @@ class PageEventos(QWidget):
             except Exception as err:
                 QMessageBox.critical(self, "Erro", f"Linha {r+1}: {err}")
                 return
+        # ordena uma única vez em vez de a cada linha
+        self.service.eventos.clear()
+        self.service.add_events(novos)
         conflicts = self.service.resolve_conflicts()
         if conflicts:
             QMessageBox.critical(